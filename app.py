@@ -1,192 +1,1589 @@
-from flask import Flask, request, render_template_string
-import requests
+import time
+_import_started = time.perf_counter()
+
+from flask import Flask, Response, jsonify, request
+from markupsafe import Markup
 import os
+import concurrent.futures
+import array
 import datetime
+import gzip
+import hashlib
+import heapq
+import itertools
 import json
+import mmap
+import struct
+import sys
+import tempfile
+import threading
+import urllib.parse
+from collections import OrderedDict, deque
+
+try:
+    import brotli
+except ImportError:  # gzip seul si brotli n'est pas installé
+    brotli = None
+
+try:
+    import orjson
+except ImportError:  # repli sur le module json standard
+    orjson = None
+
+try:
+    import numpy as np
+except ImportError:  # calculs de probabilités en Python pur
+    np = None
 
 app = Flask(__name__)
 
-def load_json_data():
-    """Charge les données depuis le fichier JSON local"""
+JSON_FILE = os.environ.get("FEED_JSON_FILE", "Get1x2_VZip (3).json")
+
+def bitmap_positions(bitmap, start=0, limit=None):
+    """Positions (ordre du flux) des bits à 1 d'un bitmap entier, à partir du `start`-ième."""
+    bits = bin(bitmap)[:1:-1]  # bit de poids faible en premier
+    positions = []
+    pos = bits.find("1")
+    skipped = 0
+    while pos != -1 and (limit is None or len(positions) < limit):
+        if skipped < start:
+            skipped += 1
+        else:
+            positions.append(pos)
+        pos = bits.find("1", pos + 1)
+    return positions
+
+DEFAULT_PER_PAGE = 20
+MAX_PER_PAGE = 100
+
+def parse_per_page(value):
+    """Taille de page validée : entier entre 1 et MAX_PER_PAGE, sinon la valeur par défaut"""
     try:
-        with open('Get1x2_VZip (3).json', 'r', encoding='utf-8') as file:
-            data = json.load(file)
-            return data.get("Value", [])
+        per_page = int(value)
+    except (TypeError, ValueError):
+        return DEFAULT_PER_PAGE
+    return per_page if 1 <= per_page <= MAX_PER_PAGE else DEFAULT_PER_PAGE
+
+def paginate(snapshot, selected, page=1, per_page=DEFAULT_PER_PAGE, after=None):
+    """Découpe un bitmap de sélection sans matérialiser les autres pages.
+
+    `after` (identifiant du dernier match vu) active la pagination par curseur :
+    on masque tout ce qui précède au lieu de sauter `offset` résultats.
+    Renvoie (positions, page, total_pages, total).
+    """
+    total = selected.bit_count()
+    total_pages = max(1, (total + per_page - 1) // per_page)
+    cursor = snapshot.positions.get(after) if after is not None else None
+    if cursor is not None:
+        before_mask = (1 << (cursor + 1)) - 1
+        seen = (selected & before_mask).bit_count()
+        page = min(seen // per_page + 1, total_pages)
+        return bitmap_positions(selected & ~before_mask, limit=per_page), page, total_pages, total
+    page = max(1, min(page, total_pages))
+    return bitmap_positions(selected, start=(page - 1) * per_page, limit=per_page), page, total_pages, total
+
+FEED_READ_CHUNK = 64 * 1024
+
+class _JsonStream:
+    """Lecture incrémentale d'un document JSON : seul le morceau en cours reste en mémoire."""
+
+    _decoder = json.JSONDecoder()
+
+    def __init__(self, file, chunk_size=FEED_READ_CHUNK):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, size):
+        chunk = self.file.read(size)
+        if not chunk:
+            self.eof = True
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+
+    def _skip_ws(self):
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf) or self.eof:
+                return
+            self._fill(self.chunk_size)
+
+    def next_char(self):
+        """Consomme et renvoie le prochain caractère significatif ('' en fin de fichier)"""
+        self._skip_ws()
+        if self.pos >= len(self.buf):
+            return ""
+        ch = self.buf[self.pos]
+        self.pos += 1
+        return ch
+
+    def peek(self):
+        self._skip_ws()
+        return self.buf[self.pos] if self.pos < len(self.buf) else ""
+
+    def expect(self, expected):
+        ch = self.next_char()
+        if ch != expected:
+            raise ValueError(f"JSON invalide : '{expected}' attendu, '{ch}' trouvé")
+
+    def value(self):
+        """Décode une valeur JSON complète, en lisant plus de données tant qu'elle est tronquée"""
+        self._skip_ws()
+        size = self.chunk_size
+        while True:
+            try:
+                obj, end = self._decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            else:
+                # Un nombre coupé en fin de tampon se décode « avec succès » : on vérifie la suite
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return obj
+            self._fill(size)
+            size *= 2  # gros événement : on agrandit les lectures au lieu de redécoder en boucle
+
+def iter_feed_events(file, chunk_size=FEED_READ_CHUNK):
+    """Parcourt le tableau `Value` d'un flux 1xbet un événement à la fois.
+
+    Les autres clés de premier niveau sont lues puis ignorées ; un `Value`
+    objet (flux d'un seul match) est renvoyé comme unique événement.
+    """
+    stream = _JsonStream(file, chunk_size)
+    stream.expect("{")
+    if stream.peek() == "}":
+        return
+    while True:
+        key = stream.value()
+        stream.expect(":")
+        if key == "Value" and stream.peek() == "[":
+            stream.expect("[")
+            if stream.peek() == "]":
+                stream.next_char()
+            else:
+                while True:
+                    yield stream.value()
+                    ch = stream.next_char()
+                    if ch == "]":
+                        break
+                    if ch != ",":
+                        raise ValueError(f"JSON invalide : ',' ou ']' attendu, '{ch}' trouvé")
+        elif key == "Value":
+            value = stream.value()
+            if isinstance(value, dict):
+                yield value
+        else:
+            stream.value()
+        ch = stream.next_char()
+        if ch == "}":
+            return
+        if ch != ",":
+            raise ValueError(f"JSON invalide : ',' ou '}}' attendu, '{ch}' trouvé")
+
+class FeedSnapshot:
+    """Vue figée du flux : une requête garde la même instance du début à la fin."""
+    __slots__ = ("version", "matches", "source", "loaded_at", "mtime", "size", "by_id", "positions",
+                 "by_sport", "by_league", "by_status", "all_bitmap", "sports", "leagues",
+                 "base_version", "changes")
+
+    def __init__(self, version, matches, source, loaded_at, mtime=None, size=None):
+        self.version = version
+        self.matches = matches
+        self.source = source
+        self.loaded_at = loaded_at
+        self.mtime = mtime
+        self.size = size
+        # Index I -> match construit une fois pour toute la durée de vie du snapshot
+        self.by_id = {m.id: m for m in matches if m.id is not None}
+        self.positions = {m.id: pos for pos, m in enumerate(matches) if m.id is not None}
+        # Index inversés sport / ligue / statut -> bitmap des positions dans le flux
+        self.by_sport = {}
+        self.by_league = {}
+        self.by_status = {"live": 0, "finished": 0, "upcoming": 0}
+        for pos, m in enumerate(matches):
+            bit = 1 << pos
+            self.by_sport[m.sport] = self.by_sport.get(m.sport, 0) | bit
+            self.by_league[m.league] = self.by_league.get(m.league, 0) | bit
+            if m.is_live:
+                self.by_status["live"] |= bit
+            if m.is_finished:
+                self.by_status["finished"] |= bit
+            if m.is_upcoming:
+                self.by_status["upcoming"] |= bit
+        self.all_bitmap = (1 << len(matches)) - 1
+        self.sports = sorted(self.by_sport)
+        self.leagues = sorted(self.by_league)
+        # Deltas par match depuis le snapshot `base_version` (renseignés par SnapshotStore)
+        self.base_version = None
+        self.changes = None
+
+    def select(self, sport="", league="", status=""):
+        """Bitmap des matchs correspondant aux filtres (un filtre vide ne filtre pas)."""
+        bitmap = self.all_bitmap
+        if sport:
+            bitmap &= self.by_sport.get(sport, 0)
+        if league:
+            bitmap &= self.by_league.get(league, 0)
+        if status in self.by_status:
+            bitmap &= self.by_status[status]
+        return bitmap
+
+# --- Snapshot binaire : redémarrage et rechargement sans reparser le JSON ---
+
+FEED_BINARY_FILE = os.environ.get("FEED_BINARY_FILE", "feed_snapshot.bin")
+BINARY_MAGIC = b"1XFEEDSN"
+BINARY_FORMAT = 1
+# magic, format, réservé, version, loaded_at, mtime source, taille source, nb matchs, nb chaînes,
+# index de la chaîne « source », offset table des chaînes, offset des enregistrements
+BINARY_HEADER = struct.Struct("<8sHHQdqqIIIQQ")
+# id, team1, team2, league, sport, status, score1, score2, minute, drapeaux, start_ts,
+# temp, humid, nb cotes 1X2, nb stats, nb marchés (les chaînes sont des index de la table)
+BINARY_RECORD = struct.Struct("<qIIIIIiiiBqIIBHI")
+BINARY_ODD = struct.Struct("<Bd")
+BINARY_STAT = struct.Struct("<III")
+BINARY_MARKET = struct.Struct("<iidd")
+BINARY_LENGTH = struct.Struct("<I")
+_ODD_LABELS = ("1", "2", "X")
+_NONE_INT = -(2 ** 31)
+_FLAG_LIVE, _FLAG_FINISHED, _FLAG_UPCOMING, _FLAG_MINUTE, _FLAG_ID = 1, 2, 4, 8, 16
+
+def _encode_match(match, intern):
+    markets = match.iter_markets()
+    flags = ((_FLAG_LIVE if match.is_live else 0) | (_FLAG_FINISHED if match.is_finished else 0)
+             | (_FLAG_UPCOMING if match.is_upcoming else 0)
+             | (_FLAG_MINUTE if match.minute is not None else 0) | (_FLAG_ID if match.id is not None else 0))
+    parts = [BINARY_RECORD.pack(
+        match.id or 0, intern(match.team1), intern(match.team2), intern(match.league), intern(match.sport),
+        intern(match.status), match.score1, match.score2, match.minute or 0, flags, match.start_ts or 0,
+        intern(match.temp), intern(match.humid), len(match.odds), len(match.stats), len(markets),
+    )]
+    parts.extend(BINARY_ODD.pack(_ODD_LABELS.index(label), cote) for label, cote in match.odds)
+    parts.extend(BINARY_STAT.pack(intern(st["nom"]), intern(st["s1"]), intern(st["s2"])) for st in match.stats)
+    parts.extend(BINARY_MARKET.pack(
+        _NONE_INT if g is None else g, _NONE_INT if t is None else t,
+        float("nan") if p is None else p, c) for g, t, p, c in markets)
+    body = b"".join(parts)
+    return BINARY_LENGTH.pack(len(body)) + body
+
+def write_binary_snapshot(snapshot, path=FEED_BINARY_FILE):
+    """Écrit les matchs normalisés d'un snapshot au format binaire (écriture atomique)"""
+    strings = {}
+
+    def intern(value):
+        value = "" if value is None else str(value)
+        index = strings.get(value)
+        if index is None:
+            index = strings[value] = len(strings)
+        return index
+
+    source_idx = intern(snapshot.source)
+    records = b"".join(_encode_match(m, intern) for m in snapshot.matches)
+    table = b"".join(BINARY_LENGTH.pack(len(raw)) + raw for raw in (k.encode("utf-8") for k in strings))
+    strings_offset = BINARY_HEADER.size
+    records_offset = strings_offset + len(table)
+    header = BINARY_HEADER.pack(
+        BINARY_MAGIC, BINARY_FORMAT, 0, snapshot.version, snapshot.loaded_at,
+        snapshot.mtime if snapshot.mtime is not None else -1,
+        snapshot.size if snapshot.size is not None else -1,
+        len(snapshot.matches), len(strings), source_idx, strings_offset, records_offset,
+    )
+    # Fichier temporaire propre à chaque écriture, comme pour save_last_good
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp",
+                                    dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            file.write(header)
+            file.write(table)
+            file.write(records)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+class BinarySnapshot:
+    """Contenu décodé d'un snapshot binaire"""
+    __slots__ = ("version", "loaded_at", "source", "mtime", "size", "matches")
+
+def _decode_markets(raw):
+    return tuple((None if g == _NONE_INT else g, None if t == _NONE_INT else t, None if p != p else p, c)
+                 for g, t, p, c in BINARY_MARKET.iter_unpack(raw))
+
+def _decode_matches(buf, offset, count, strings):
+    matches = []
+    for _ in range(count):
+        (length,) = BINARY_LENGTH.unpack_from(buf, offset)
+        offset += BINARY_LENGTH.size
+        end = offset + length
+        if end > len(buf):
+            raise ValueError("enregistrement tronqué")
+        (match_id, team1, team2, league, sport, status, score1, score2, minute, flags, start_ts,
+         temp, humid, n_odds, n_stats, n_markets) = BINARY_RECORD.unpack_from(buf, offset)
+        offset += BINARY_RECORD.size
+        odds = tuple((_ODD_LABELS[label], cote)
+                     for label, cote in BINARY_ODD.iter_unpack(buf[offset:offset + n_odds * BINARY_ODD.size]))
+        offset += n_odds * BINARY_ODD.size
+        stats = [{"nom": strings[n], "s1": strings[a], "s2": strings[b]}
+                 for n, a, b in BINARY_STAT.iter_unpack(buf[offset:offset + n_stats * BINARY_STAT.size])]
+        offset += n_stats * BINARY_STAT.size
+        # Les marchés, la partie la plus volumineuse, ne sont décodés qu'à la demande (Match.markets)
+        markets = buf[offset:offset + n_markets * BINARY_MARKET.size]
+        offset += n_markets * BINARY_MARKET.size
+        if offset != end:
+            raise ValueError("longueur d'enregistrement incohérente")
+        matches.append(Match(
+            id=match_id if flags & _FLAG_ID else None,
+            team1=strings[team1], team2=strings[team2], league=strings[league], sport=strings[sport],
+            score1=score1, score2=score2, minute=minute if flags & _FLAG_MINUTE else None,
+            status=strings[status], is_live=bool(flags & _FLAG_LIVE),
+            is_finished=bool(flags & _FLAG_FINISHED), is_upcoming=bool(flags & _FLAG_UPCOMING),
+            start_ts=start_ts, odds=odds, temp=strings[temp], humid=strings[humid],
+            stats=stats, markets=markets,
+        ))
+    return matches
+
+def load_binary_snapshot(path=FEED_BINARY_FILE, shared=False, source=None, mtime=None, size=None):
+    """Lit un snapshot binaire via mmap ; None s'il est absent, d'un format inconnu ou corrompu.
+
+    Avec `shared=True` le fichier reste mappé et les marchés des matchs pointent
+    directement dans la projection (pages partagées entre processus, sans copie).
+    `source`, `mtime` et `size`, s'ils sont donnés, sont comparés à l'en-tête :
+    un snapshot d'une autre version du flux est écarté sans décoder ses matchs.
+    """
+    try:
+        file = open(path, 'rb')
     except FileNotFoundError:
-        print("Fichier JSON non trouvé, utilisation de l'API en ligne")
-        return load_from_api()
-    except Exception as e:
-        print(f"Erreur lors du chargement du fichier JSON: {e}")
-        return load_from_api()
+        return None
+    with file:
+        try:
+            buf = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # fichier vide
+            return None
+    decoded = False
+    try:
+        if len(buf) < BINARY_HEADER.size:
+            return None
+        (magic, fmt, _, version, loaded_at, file_mtime, file_size, n_records, n_strings, source_idx,
+         strings_offset, records_offset) = BINARY_HEADER.unpack_from(buf, 0)
+        if magic != BINARY_MAGIC or fmt != BINARY_FORMAT:
+            return None
+        if (mtime is not None and file_mtime != mtime) or (size is not None and file_size != size):
+            return None
+        if not BINARY_HEADER.size <= strings_offset <= records_offset <= len(buf):
+            raise ValueError("offsets hors du fichier")
+        strings = []
+        offset = strings_offset
+        for _ in range(n_strings):
+            (length,) = BINARY_LENGTH.unpack_from(buf, offset)
+            offset += BINARY_LENGTH.size
+            if offset + length > records_offset:
+                raise ValueError("table des chaînes tronquée")
+            strings.append(buf[offset:offset + length].decode("utf-8"))
+            offset += length
+        if source is not None and strings[source_idx] != source:
+            return None
+        snapshot = BinarySnapshot()
+        snapshot.version = version
+        snapshot.loaded_at = loaded_at
+        snapshot.source = strings[source_idx]
+        snapshot.mtime = None if file_mtime < 0 else file_mtime
+        snapshot.size = None if file_size < 0 else file_size
+        snapshot.matches = _decode_matches(memoryview(buf) if shared else buf, records_offset, n_records, strings)
+        decoded = True
+        return snapshot
+    except (struct.error, IndexError, UnicodeDecodeError, ValueError) as e:
+        # Fichier tronqué ou abîmé : l'appelant retombe sur le JSON
+        print(f"Snapshot binaire illisible ({path}): {e}")
+        return None
+    finally:
+        if not shared or not decoded:
+            try:
+                buf.close()
+            except BufferError:  # des vues partielles existent encore, le GC libérera la projection
+                pass
+
+# --- Différences entre snapshots ---
+
+class MatchDelta:
+    """Changements d'un match entre deux snapshots.
+
+    `kind` vaut "added", "removed" ou "changed" ; `score`, `minute` et `status`
+    sont des couples (avant, après) ou None, `odds` la liste des cotes modifiées
+    sous la forme ((G, T, P), avant, après), None signifiant absente.
+    """
+    __slots__ = ("id", "kind", "score", "minute", "status", "odds")
+
+    def __init__(self, match_id, kind, score=None, minute=None, status=None, odds=()):
+        self.id = match_id
+        self.kind = kind
+        self.score = score
+        self.minute = minute
+        self.status = status
+        self.odds = odds
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "score": self.score,
+            "minute": self.minute,
+            "status": self.status,
+            "odds": [{"market": list(key), "before": before, "after": after} for key, before, after in self.odds],
+        }
+
+def diff_match(old, new):
+    """Delta entre deux versions d'un match ; None si score, minute, statut et cotes sont inchangés"""
+    score = minute = status = None
+    if old.score1 != new.score1 or old.score2 != new.score2:
+        score = ((old.score1, old.score2), (new.score1, new.score2))
+    if old.minute != new.minute:
+        minute = (old.minute, new.minute)
+    if old.status != new.status:
+        status = (old.status, new.status)
+    odds = []
+    if not old.same_markets(new):
+        before = {(g, t, p): c for g, t, p, c in old.iter_markets()}
+        after = {(g, t, p): c for g, t, p, c in new.iter_markets()}
+        for key, cote in after.items():
+            if before.get(key) != cote:
+                odds.append((key, before.get(key), cote))
+        odds.extend((key, cote, None) for key, cote in before.items() if key not in after)
+    if score is None and minute is None and status is None and not odds:
+        return None
+    return MatchDelta(new.id, "changed", score, minute, status, odds)
+
+def diff_snapshots(old, new, ids=None):
+    """Deltas par identifiant entre deux snapshots ; `ids` limite la comparaison à ces matchs."""
+    changes = []
+    for match_id in (new.by_id if ids is None else ids):
+        match = new.by_id.get(match_id)
+        previous = old.by_id.get(match_id)
+        if match is None:
+            continue
+        if previous is None:
+            changes.append(MatchDelta(match_id, "added", status=(None, match.status)))
+        elif previous is not match:
+            delta = diff_match(previous, match)
+            if delta is not None:
+                changes.append(delta)
+    if ids is None:
+        changes.extend(MatchDelta(match_id, "removed", status=(m.status, None))
+                       for match_id, m in old.by_id.items() if match_id not in new.by_id)
+    return changes
+
+class SnapshotStore:
+    """Détient le snapshot courant du flux pour tout le processus.
+
+    Le fichier n'est relu que si sa date de modification ou sa taille change ;
+    le nouveau snapshot remplace l'ancien en une seule affectation, donc les
+    requêtes en cours continuent sur l'ancien sans rien voir de partiel.
+    """
+
+    def __init__(self, binary_path=FEED_BINARY_FILE):
+        self.binary_path = binary_path
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._version = 0
+        self._current = FeedSnapshot(0, [], "vide", 0.0)
+        self._listeners = []
+
+    @property
+    def current(self):
+        return self._current
+
+    @property
+    def version(self):
+        return self._current.version
+
+    def subscribe(self, listener):
+        """Enregistre `listener(snapshot, previous)`, appelé à chaque nouveau snapshot.
+
+        L'appel a lieu sous le verrou de publication : les abonnés voient les
+        snapshots dans l'ordre des versions et doivent rester rapides.
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, snapshot, previous):
+        for listener in self._listeners:
+            try:
+                listener(snapshot, previous)
+            except Exception as e:
+                print(f"Erreur d'un abonné au flux: {e}")
+
+    def publish(self, matches, source, mtime=None, size=None, loaded_at=None, version=None, keep=None):
+        """Installe un nouveau snapshot et incrémente la version.
+
+        `version` permet de reprendre la numérotation d'un autre processus
+        (snapshot partagé) ; elle reste toujours strictement croissante.
+        `keep` renvoie, sous le verrou, les identifiants dont la version
+        courante doit être conservée (matchs rafraîchis un par un).
+        """
+        with self._lock:
+            previous = self._current
+            kept = keep() if keep is not None else None
+            if kept:
+                matches = [previous.by_id.get(m.id, m) if m.id in kept else m for m in matches]
+            self._version = max(self._version + 1, version or 0)
+            snapshot = FeedSnapshot(self._version, matches, source, loaded_at or time.time(), mtime, size)
+            snapshot.base_version = previous.version
+            snapshot.changes = diff_snapshots(previous, snapshot)
+            self._current = snapshot
+            self._notify(snapshot, previous)
+        return snapshot
+
+    def refresh_from_file(self, path):
+        """Recharge le fichier seulement s'il a changé ; lève FileNotFoundError s'il est absent."""
+        stat = os.stat(path)
+        current = self._current
+        if current.source == path and current.mtime == stat.st_mtime_ns and current.size == stat.st_size:
+            return current
+        with self._reload_lock:
+            # Un autre thread a peut-être déjà rechargé pendant qu'on attendait
+            current = self._current
+            if current.source == path and current.mtime == stat.st_mtime_ns and current.size == stat.st_size:
+                return current
+            # Snapshot binaire à jour pour ce fichier : pas besoin de reparser le JSON
+            cached = load_binary_snapshot(self.binary_path, source=path, mtime=stat.st_mtime_ns,
+                                          size=stat.st_size) if self.binary_path else None
+            if cached is not None:
+                return self.publish(cached.matches, path, stat.st_mtime_ns, stat.st_size)
+            with open(path, 'r', encoding='utf-8') as file:
+                matches = normalize_feed(iter_feed_events(file))
+            snapshot = self.publish(matches, path, stat.st_mtime_ns, stat.st_size)
+            self.save_binary(snapshot)
+            return snapshot
+
+    def patch(self, updates):
+        """Publie un snapshot où les matchs de `updates` (id -> Match) remplacent leur version courante.
+
+        Fait sous le verrou de publication : une mise à jour par match ne peut pas
+        écraser un snapshot complet publié entre-temps par le poller.
+        """
+        with self._lock:
+            current = self._current
+            matches = [updates.get(m.id, m) for m in current.matches]
+            self._version += 1
+            snapshot = FeedSnapshot(self._version, matches, current.source, time.time(),
+                                    current.mtime, current.size)
+            # Seuls les matchs mis à jour peuvent avoir changé
+            snapshot.base_version = current.version
+            snapshot.changes = diff_snapshots(current, snapshot, ids=updates)
+            self._current = snapshot
+            self._notify(snapshot, current)
+        return snapshot
+
+    def resume_version(self, version):
+        """Reprend la numérotation après `version` (redémarrage du processus d'ingestion)"""
+        with self._lock:
+            self._version = max(self._version, version)
 
-def load_from_api():
-    """Charge les données depuis l'API en ligne (fallback)"""
+    def save_binary(self, snapshot):
+        """Écrit le snapshot binaire ; une erreur d'écriture n'empêche pas de servir le flux"""
+        if not self.binary_path:
+            return
+        try:
+            write_binary_snapshot(snapshot, self.binary_path)
+        except (OSError, struct.error) as e:
+            print(f"Erreur lors de l'écriture du snapshot binaire: {e}")
+
+feed_store = SnapshotStore()
+
+FEED_API_URL = os.environ.get(
+    "FEED_API_URL",
+    "https://1xbet.com/LiveFeed/Get1x2_VZip?count=100&lng=fr&gr=70&mode=4&country=96&top=true",
+)
+FEED_POLL_INTERVAL = float(os.environ.get("FEED_POLL_INTERVAL", 30))
+FEED_CONNECT_TIMEOUT = float(os.environ.get("FEED_CONNECT_TIMEOUT", 3.05))
+FEED_READ_TIMEOUT = float(os.environ.get("FEED_READ_TIMEOUT", 10))
+FEED_POOL_SIZE = int(os.environ.get("FEED_POOL_SIZE", 4))
+
+def make_http_session(pool_size=FEED_POOL_SIZE):
+    """Session HTTP keep-alive partagée : pool de connexions, gzip, pas de retry implicite."""
+    import requests  # seulement utile sans fichier local : importé à la première requête vers l'API
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({
+        "Accept": "application/json",
+        "Accept-Encoding": "gzip, deflate",
+        "Connection": "keep-alive",
+    })
+    return session
+
+def load_from_api(session, url=FEED_API_URL, validators=None,
+                  timeout=(FEED_CONNECT_TIMEOUT, FEED_READ_TIMEOUT)):
+    """Charge les données depuis l'API en ligne.
+
+    `validators` garde l'ETag / Last-Modified de la réponse précédente ; renvoie
+    None quand l'API répond 304 (flux inchangé).
+    """
+    if validators is None:
+        validators = {}
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    response = session.get(url, headers=headers, timeout=timeout)
+    if response.status_code == 304:
+        return None
+    response.raise_for_status()
+    matches = response.json().get("Value", [])
+    validators["etag"] = response.headers.get("ETag")
+    validators["last_modified"] = response.headers.get("Last-Modified")
+    return matches
+
+FEED_LAST_GOOD_FILE = os.environ.get("FEED_LAST_GOOD_FILE", "feed_last_good.json")
+FEED_BREAKER_THRESHOLD = int(os.environ.get("FEED_BREAKER_THRESHOLD", 5))
+FEED_BREAKER_RESET = float(os.environ.get("FEED_BREAKER_RESET", 60))
+
+class SingleFlight:
+    """Fusionne les appels concurrents : un seul exécute la fonction, les autres partagent son résultat."""
+
+    class _Call:
+        __slots__ = ("event", "result", "error")
+
+        def __init__(self):
+            self.event = threading.Event()
+            self.result = None
+            self.error = None
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._call = None
+
+    def do(self, fn):
+        with self._lock:
+            call = self._call
+            leader = call is None
+            if leader:
+                call = self._call = self._Call()
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._call = None
+            call.event.set()
+        return call.result
+
+class CircuitBreaker:
+    """Coupe les appels à l'API après `threshold` échecs consécutifs, puis retente après `reset_timeout`."""
+
+    def __init__(self, threshold=FEED_BREAKER_THRESHOLD, reset_timeout=FEED_BREAKER_RESET):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.time() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        return self.state != "open"
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                # En half-open, un nouvel échec ré-ouvre le circuit pour une période complète
+                self.opened_at = time.time()
+
+def save_last_good(raw_matches, saved_at, path=FEED_LAST_GOOD_FILE):
+    """Écrit le dernier flux valide sur disque (écriture atomique via un fichier temporaire).
+
+    Le fichier temporaire est propre à chaque écriture : plusieurs workers
+    gunicorn peuvent sauvegarder en même temps sans mélanger leurs octets.
+    """
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp",
+                                    dir=os.path.dirname(os.path.abspath(path)))
     try:
-        api_url = "https://1xbet.com/LiveFeed/Get1x2_VZip?count=100&lng=fr&gr=70&mode=4&country=96&top=true"
-        response = requests.get(api_url)
-        return response.json().get("Value", [])
-    except Exception as e:
-        print(f"Erreur lors du chargement depuis l'API: {e}")
-        return []
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            json.dump({"saved_at": saved_at, "Value": raw_matches}, file, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
 
-@app.route('/')
-def home():
+def load_last_good(store, path=FEED_LAST_GOOD_FILE):
+    """Republie le dernier flux valide sauvegardé, avec sa date d'origine.
+
+    Renvoie None si la sauvegarde est absente, illisible ou corrompue.
+    """
     try:
-        selected_sport = request.args.get("sport", "").strip()
-        selected_league = request.args.get("league", "").strip()
-        selected_status = request.args.get("status", "").strip()
+        with open(path, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"Sauvegarde du flux illisible ({path}): {e}")
+        return None
+    if not isinstance(data, dict) or not isinstance(data.get("Value"), list):
+        print(f"Sauvegarde du flux illisible ({path}): format inattendu")
+        return None
+    return store.publish(normalize_feed(data["Value"]), "last-good", loaded_at=data.get("saved_at"))
 
-        # Utiliser le fichier JSON local
-        matches = load_json_data()
+FEED_FANOUT = os.environ.get("FEED_FANOUT", "")
+FEED_FANOUT_CONCURRENCY = int(os.environ.get("FEED_FANOUT_CONCURRENCY", 8))
+
+def build_fanout_urls(base_url, grid):
+    """Une URL par combinaison de paramètres, ex. {"sports": [1, 2], "lng": ["fr", "en"]} -> 4 URLs"""
+    parts = urllib.parse.urlsplit(base_url)
+    base_params = dict(urllib.parse.parse_qsl(parts.query))
+    names = list(grid)
+    urls = []
+    for values in itertools.product(*(grid[name] for name in names)):
+        params = dict(base_params)
+        params.update({name: str(value) for name, value in zip(names, values)})
+        urls.append(urllib.parse.urlunsplit(parts._replace(query=urllib.parse.urlencode(params))))
+    return urls
+
+class FetchTiming:
+    """Durée et résultat d'une requête du fan-out"""
+    __slots__ = ("url", "status", "elapsed_ms", "count")
+
+    def __init__(self, url, status, elapsed_ms, count):
+        self.url = url
+        self.status = status
+        self.elapsed_ms = elapsed_ms
+        self.count = count
+
+    def to_dict(self):
+        return {"url": self.url, "status": self.status, "elapsed_ms": round(self.elapsed_ms, 1), "count": self.count}
+
+class FanoutFetcher:
+    """Interroge plusieurs variantes du flux en parallèle (asyncio, concurrence bornée).
+
+    Chaque URL garde ses propres validateurs ETag / Last-Modified et son dernier
+    résultat : une URL en 304 ou en erreur réutilise ses données précédentes.
+    Les événements sont fusionnés par identifiant `I`, la première URL gagnant.
+    """
 
-        sports_detected = set()
-        leagues_detected = set()
-        data = []
+    def __init__(self, urls, session=None, concurrency=FEED_FANOUT_CONCURRENCY):
+        self.urls = list(urls)
+        self.session = session
+        self.concurrency = concurrency
+        self.validators = {url: {} for url in self.urls}
+        self.last_results = {url: [] for url in self.urls}
+        self.timings = []
 
-        for match in matches:
+    async def _fetch_one(self, semaphore, executor, url):
+        import asyncio
+        async with semaphore:
+            started = time.perf_counter()
             try:
-                league = match.get("LE", "–")
-                team1 = match.get("O1", "–")
-                team2 = match.get("O2", "–")
-                sport = detect_sport(league).strip()
-                sports_detected.add(sport)
-                leagues_detected.add(league)
-
-                # --- Score ---
-                score1 = match.get("SC", {}).get("FS", {}).get("S1")
-                score2 = match.get("SC", {}).get("FS", {}).get("S2")
-                try:
-                    score1 = int(score1) if score1 is not None else 0
-                except:
-                    score1 = 0
-                try:
-                    score2 = int(score2) if score2 is not None else 0
-                except:
-                    score2 = 0
-
-                # --- Minute ---
-                minute = None
-                # Prendre d'abord SC.TS (temps écoulé en secondes)
-                sc = match.get("SC", {})
-                if "TS" in sc and isinstance(sc["TS"], int):
-                    minute = sc["TS"] // 60
-                elif "ST" in sc and isinstance(sc["ST"], int):
-                    minute = sc["ST"]
-                elif "T" in match and isinstance(match["T"], int):
-                    minute = match["T"] // 60
-
-                # --- Statut ---
-                tn = match.get("TN", "").lower()
-                tns = match.get("TNS", "").lower()
-                tt = match.get("SC", {}).get("TT")
-                statut = "À venir"
-                is_live = False
-                is_finished = False
-                is_upcoming = False
-                if (minute is not None and minute > 0) or (score1 > 0 or score2 > 0):
-                    statut = f"En cours ({minute}′)" if minute else "En cours"
-                    is_live = True
-                if ("terminé" in tn or "terminé" in tns) or (tt == 3):
-                    statut = "Terminé"
-                    is_live = False
-                    is_finished = True
-                if statut == "À venir":
-                    is_upcoming = True
-
-                if selected_sport and sport != selected_sport:
-                    continue
-                if selected_league and league != selected_league:
-                    continue
-                if selected_status == "live" and not is_live:
-                    continue
-                if selected_status == "finished" and not is_finished:
-                    continue
-                if selected_status == "upcoming" and not is_upcoming:
+                result = await asyncio.get_running_loop().run_in_executor(
+                    executor, load_from_api, self.session, url, self.validators[url])
+            except Exception as e:
+                elapsed = (time.perf_counter() - started) * 1000
+                return url, None, FetchTiming(url, f"erreur: {e}", elapsed, 0)
+            elapsed = (time.perf_counter() - started) * 1000
+            if result is None:
+                return url, None, FetchTiming(url, "304", elapsed, len(self.last_results[url]))
+            return url, result, FetchTiming(url, "200", elapsed, len(result))
+
+    async def fetch_all(self):
+        """Lance toutes les requêtes ; renvoie la liste fusionnée, ou None si aucune URL n'a changé."""
+        import asyncio
+        if self.session is None:
+            self.session = make_http_session(pool_size=self.concurrency)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        # Pool dédié de la taille de la concurrence (et du pool de connexions de la session) :
+        # l'exécuteur par défaut d'asyncio plafonne à min(32, cpu + 4) threads
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.concurrency,
+                                                   thread_name_prefix="feed-fanout") as executor:
+            results = await asyncio.gather(*(self._fetch_one(semaphore, executor, url) for url in self.urls))
+        self.timings = [timing for _, _, timing in results]
+        if all(timing.status.startswith("erreur") for timing in self.timings):
+            raise RuntimeError(f"Toutes les requêtes du fan-out ont échoué ({len(self.urls)})")
+        changed = False
+        for url, result, _ in results:
+            if result is not None:
+                self.last_results[url] = result
+                changed = True
+        if not changed:
+            return None
+        return merge_events(self.last_results[url] for url in self.urls)
+
+    def fetch(self):
+        import asyncio  # seulement pour le fan-out : hors du chemin de démarrage
+        return asyncio.run(self.fetch_all())
+
+def merge_events(event_lists):
+    """Fusionne plusieurs listes d'événements bruts en supprimant les doublons d'identifiant `I`"""
+    seen = set()
+    merged = []
+    for events in event_lists:
+        for event in events:
+            event_id = event.get("I")
+            if event_id is not None:
+                if event_id in seen:
                     continue
+                seen.add(event_id)
+            merged.append(event)
+    return merged
+
+FEED_EVENT_POLLING = os.environ.get("FEED_EVENT_POLLING", "").lower() in ("1", "true", "yes")
+FEED_EVENT_URL = os.environ.get("FEED_EVENT_URL", "https://1xbet.com/LiveFeed/GetGameZip?id={id}&lng=fr")
+FEED_LIVE_INTERVAL = float(os.environ.get("FEED_LIVE_INTERVAL", 5))
+FEED_UPCOMING_INTERVAL = float(os.environ.get("FEED_UPCOMING_INTERVAL", 120))
+FEED_EVENT_BUDGET = float(os.environ.get("FEED_EVENT_BUDGET", 5))
+FEED_EVENT_WORKERS = int(os.environ.get("FEED_EVENT_WORKERS", 4))
+
+class MatchScheduler:
+    """Rafraîchit chaque match à son rythme : les matchs en direct souvent, ceux à venir rarement.
 
-                match_ts = match.get("S", 0)
-                match_time = datetime.datetime.utcfromtimestamp(match_ts).strftime('%d/%m/%Y %H:%M') if match_ts else "–"
-
-                # --- Cotes ---
-                odds_data = []
-                # 1. Chercher dans E (G=1)
-                for o in match.get("E", []):
-                    if o.get("G") == 1 and o.get("T") in [1, 2, 3] and o.get("C") is not None:
-                        odds_data.append({
-                            "type": {1: "1", 2: "2", 3: "X"}.get(o.get("T")),
-                            "cote": o.get("C")
-                        })
-                # 2. Sinon, chercher dans AE
-                if not odds_data:
-                    for ae in match.get("AE", []):
-                        if ae.get("G") == 1:
-                            for o in ae.get("ME", []):
-                                if o.get("T") in [1, 2, 3] and o.get("C") is not None:
-                                    odds_data.append({
-                                        "type": {1: "1", 2: "2", 3: "X"}.get(o.get("T")),
-                                        "cote": o.get("C")
-                                    })
-                if not odds_data:
-                    formatted_odds = ["Pas de cotes disponibles"]
+    Les matchs terminés ne sont plus interrogés. Un budget global (requêtes par
+    seconde, seau à jetons) limite les appels ; quand il ne suffit pas, les
+    matchs en direct passent en premier. Un match rafraîchi individuellement
+    n'est plus écrasé par le flux complet, souvent en retard sur lui (owned_ids).
+    """
+    PRIORITY = {"live": 0, "upcoming": 1}
+
+    def __init__(self, store, url_template=FEED_EVENT_URL, session=None, budget=FEED_EVENT_BUDGET,
+                 live_interval=FEED_LIVE_INTERVAL, upcoming_interval=FEED_UPCOMING_INTERVAL,
+                 workers=FEED_EVENT_WORKERS, clock=time.monotonic):
+        self.store = store
+        self.url_template = url_template
+        self.session = session
+        self.budget = budget
+        self.intervals = {"live": live_interval, "upcoming": upcoming_interval}
+        self.workers = workers
+        self.clock = clock
+        self.requests = 0
+        self._due = {}  # id -> [échéance, classe]
+        self._validators = {}
+        self._owned = set()  # matchs dont la dernière version publiée vient d'une requête individuelle
+        self._tokens = budget
+        self._refilled_at = clock()
+        self._synced_version = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def classify(match):
+        """Même découpage que les filtres de home() : live / upcoming / finished"""
+        if match.is_finished:
+            return "finished"
+        return "live" if match.is_live else "upcoming"
+
+    def sync(self, snapshot):
+        """Aligne le planning sur le snapshot : nouveaux matchs, changements de statut, disparitions"""
+        if snapshot.version == self._synced_version:
+            return
+        self._synced_version = snapshot.version
+        now = self.clock()
+        for match in snapshot.matches:
+            if match.id is None:
+                continue
+            klass = self.classify(match)
+            entry = self._due.get(match.id)
+            if klass == "finished":
+                self._forget(match.id)
+            elif entry is None:
+                # Un match en direct qu'on découvre est rafraîchi tout de suite
+                self._due[match.id] = [now if klass == "live" else now + self.intervals[klass], klass]
+            elif entry[1] != klass:
+                entry[0] = min(entry[0], now + self.intervals[klass])
+                entry[1] = klass
+        for match_id in [i for i in self._due if i not in snapshot.by_id]:
+            self._forget(match_id)
+        self._owned.intersection_update(snapshot.by_id)
+
+    def owned_ids(self):
+        """Identifiants à ne pas reprendre du flux complet (voir SnapshotStore.publish)"""
+        return set(self._owned)
+
+    def _forget(self, match_id):
+        self._due.pop(match_id, None)
+        self._validators.pop(match_id, None)
+
+    def _take_due(self, now):
+        # Le seau contient au moins un jeton : avec un budget sous 1 requête/s, on attend d'avoir une requête entière
+        self._tokens = min(max(self.budget, 1), self._tokens + (now - self._refilled_at) * self.budget)
+        self._refilled_at = now
+        due = sorted((self.PRIORITY[klass], when, match_id)
+                     for match_id, (when, klass) in self._due.items() if when <= now)
+        batch = [match_id for _, _, match_id in due[:int(self._tokens)]]
+        self._tokens -= len(batch)
+        return batch
+
+    def _fetch(self, match_id):
+        validators = self._validators.setdefault(match_id, {})
+        return load_from_api(self.session, self.url_template.format(id=match_id), validators)
+
+    def tick(self):
+        """Un passage du planificateur ; renvoie les matchs mis à jour (id -> Match)"""
+        self.sync(self.store.current)
+        now = self.clock()
+        batch = self._take_due(now)
+        if not batch:
+            return {}
+        if self.session is None:
+            self.session = make_http_session(pool_size=self.workers)
+        updates = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self._fetch, match_id): match_id for match_id in batch}
+            for future in concurrent.futures.as_completed(futures):
+                match_id = futures[future]
+                self.requests += 1
+                klass = self._due[match_id][1]
+                try:
+                    raw = future.result()
+                    if isinstance(raw, dict) and raw:
+                        match = normalize_match(raw)
+                        updates[match_id] = match
+                        klass = self.classify(match)
+                except Exception as e:
+                    # Le flux complet reprend la main sur ce match en attendant
+                    self._owned.discard(match_id)
+                    print(f"Erreur lors du rafraîchissement du match {match_id}: {e}")
+                if klass == "finished":
+                    self._forget(match_id)
                 else:
-                    formatted_odds = [f"{od['type']}: {od['cote']}" for od in odds_data]
-
-                prediction = "–"
-                if odds_data:
-                    best = min(odds_data, key=lambda x: x["cote"])
-                    prediction = {
-                        "1": f"{team1} gagne",
-                        "2": f"{team2} gagne",
-                        "X": "Match nul"
-                    }.get(best["type"], "–")
-
-                # --- Météo ---
-                meteo_data = match.get("MIS", [])
-                temp = next((item["V"] for item in meteo_data if item.get("K") == 9), "–")
-                humid = next((item["V"] for item in meteo_data if item.get("K") == 27), "–")
-
-                data.append({
-                    "team1": team1,
-                    "team2": team2,
-                    "score1": score1,
-                    "score2": score2,
-                    "league": league,
-                    "sport": sport,
-                    "status": statut,
-                    "datetime": match_time,
-                    "temp": temp,
-                    "humid": humid,
-                    "odds": formatted_odds,
-                    "prediction": prediction,
-                    "id": match.get("I", None)
-                })
+                    self._due[match_id] = [self.clock() + self.intervals[klass], klass]
+        if updates:
+            self._owned.update(updates)
+            snapshot = self.store.patch(updates)
+            self.store.save_binary(snapshot)
+            self._synced_version = None
+        return updates
+
+    def stats(self):
+        counts = {"live": 0, "upcoming": 0}
+        for _, klass in list(self._due.values()):
+            counts[klass] += 1
+        return {"scheduled": counts, "requests": self.requests, "budget_per_second": self.budget}
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.tick()
             except Exception as e:
-                print(f"Erreur lors du traitement d'un match: {e}")
-                continue
+                print(f"Erreur du planificateur de matchs: {e}")
+            self._stop.wait(0.5)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="match-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+class FeedPoller:
+    """Rafraîchit le flux en tâche de fond ; les routes ne lisent que le snapshot."""
+
+    def __init__(self, store, url=FEED_API_URL, interval=FEED_POLL_INTERVAL, session=None,
+                 breaker=None, last_good_path=FEED_LAST_GOOD_FILE, fanout=None, scheduler=None):
+        self.store = store
+        self.url = url
+        self.fanout = fanout
+        self.scheduler = scheduler
+        self.interval = interval
+        self.session = session
+        self.validators = {}
+        self.breaker = breaker or CircuitBreaker()
+        self.last_good_path = last_good_path
+        self._flight = SingleFlight()
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def poll_once(self):
+        """Un cycle de rafraîchissement ; renvoie le nouveau snapshot ou None si rien n'a changé."""
+        if self.fanout is not None:
+            raw_matches = self.fanout.fetch()
+        else:
+            if self.session is None:
+                self.session = make_http_session()
+            raw_matches = load_from_api(self.session, self.url, self.validators)
+        if raw_matches is None:
+            return None
+        keep = self.scheduler.owned_ids if self.scheduler is not None else None
+        snapshot = self.store.publish(normalize_feed(raw_matches), "api", keep=keep)
+        self.store.save_binary(snapshot)
+        if self.last_good_path:
+            try:
+                save_last_good(raw_matches, snapshot.loaded_at, self.last_good_path)
+            except OSError as e:
+                print(f"Erreur lors de la sauvegarde du flux: {e}")
+        return snapshot
+
+    def refresh(self):
+        """Rafraîchissement partagé : les appels simultanés attendent le même fetch.
+
+        Renvoie None si le flux n'a pas changé ou si le circuit est ouvert.
+        """
+        return self._flight.do(self._refresh)
 
-        # --- Pagination ---
+    def _refresh(self):
+        if not self.breaker.allow():
+            return None
+        try:
+            snapshot = self.poll_once()
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return snapshot
+
+    @property
+    def degraded(self):
+        """Vrai quand on sert des données de secours plutôt qu'un flux frais"""
+        return self.breaker.state != "closed" or self.store.current.source == "last-good"
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Erreur lors du chargement depuis l'API: {e}")
+            self._stop.wait(self.interval)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        with self._start_lock:
+            if self.running:
+                return
+            if self.store.version == 0:
+                # Démarrage à froid : servir le dernier flux connu en attendant l'API,
+                # depuis le snapshot binaire si possible, sinon depuis la sauvegarde JSON.
+                # Un échec ici ne doit pas empêcher le poller de démarrer.
+                try:
+                    cached = load_binary_snapshot(self.store.binary_path, source="api") if self.store.binary_path else None
+                    if cached is not None:
+                        self.store.publish(cached.matches, "last-good", loaded_at=cached.loaded_at)
+                    elif self.last_good_path:
+                        load_last_good(self.store, self.last_good_path)
+                except Exception as e:
+                    print(f"Erreur lors de la reprise du dernier flux connu: {e}")
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="feed-poller", daemon=True)
+            self._thread.start()
+            if self.scheduler is not None:
+                self.scheduler.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self.scheduler is not None:
+            self.scheduler.stop(timeout)
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+feed_poller = FeedPoller(
+    feed_store,
+    fanout=FanoutFetcher(build_fanout_urls(FEED_API_URL, json.loads(FEED_FANOUT))) if FEED_FANOUT else None,
+    scheduler=MatchScheduler(feed_store) if FEED_EVENT_POLLING else None,
+)
+
+FEED_SHARED_SNAPSHOT = os.environ.get("FEED_SHARED_SNAPSHOT", "").lower() in ("1", "true", "yes")
+FEED_SHARED_CHECK = float(os.environ.get("FEED_SHARED_CHECK", 1))
+
+class SharedSnapshotReader:
+    """Côté worker : s'attache en lecture seule au snapshot binaire publié par le processus d'ingestion.
+
+    Le fichier est remplacé atomiquement (os.replace) à chaque publication ;
+    on vérifie son inode / mtime au plus toutes les `check_interval` secondes
+    et on ne le remappe que s'il a changé.
+
+    Limite : seuls les octets des marchés restent partagés. Chaque worker décode
+    encore ses objets Match (chaînes, stats), ses index et l'état de ses abonnés
+    (historique des cotes, arbitrages), donc sa mémoire croît avec le flux.
+    Mesuré sur un flux synthétique de 20 000 matchs (11 marchés chacun) : environ
+    1,7 Ko par match pour le décodage, 0,3 Ko pour les index et le diff, 2,2 Ko
+    pour l'historique des cotes ; le snapshot lui-même (7,8 Mo) n'est mappé qu'une fois.
+    """
+
+    def __init__(self, store, path=FEED_BINARY_FILE, check_interval=FEED_SHARED_CHECK):
+        self.store = store
+        self.path = path
+        self.check_interval = check_interval
+        self._signature = None
+        self._checked_at = 0.0
+        self._load_lock = threading.Lock()
+
+    def current(self):
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval and self._load_lock.acquire(blocking=False):
+            try:
+                self._checked_at = now
+                self._reload_if_changed()
+            except Exception as e:
+                print(f"Erreur lors de la lecture du snapshot partagé: {e}")
+            finally:
+                self._load_lock.release()
+        return self.store.current
+
+    def _reload_if_changed(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if signature == self._signature:
+            return
+        shared = load_binary_snapshot(self.path, shared=True)
+        if shared is None:
+            return
+        self._signature = signature
+        self.store.publish(shared.matches, shared.source, shared.mtime, shared.size,
+                           loaded_at=shared.loaded_at, version=shared.version)
+
+shared_reader = SharedSnapshotReader(feed_store)
+
+def get_snapshot():
+    """Renvoie le snapshot courant, rechargé depuis le fichier local si besoin.
+
+    Sans fichier local, on ne bloque jamais sur l'API : le poller tourne en
+    arrière-plan et on sert le dernier snapshot qu'il a publié. En mode
+    partagé (FEED_SHARED_SNAPSHOT=1), le worker ne fait que lire le snapshot
+    publié par `python app.py ingest`.
+    """
+    if FEED_SHARED_SNAPSHOT:
+        return shared_reader.current()
+    try:
+        return feed_store.refresh_from_file(JSON_FILE)
+    except FileNotFoundError:
+        if not feed_poller.running:
+            print("Fichier JSON non trouvé, utilisation de l'API en ligne")
+    except Exception as e:
+        print(f"Erreur lors du chargement du fichier JSON: {e}")
+    feed_poller.start()
+    return feed_store.current
+
+def stale_minutes(snapshot):
+    """Âge en minutes des données si on sert un flux de secours, sinon None"""
+    if snapshot.source == "last-good" or (snapshot.source == "api" and feed_poller.degraded):
+        return int((time.time() - snapshot.loaded_at) // 60)
+    return None
+
+def load_json_data():
+    """Charge les données depuis le fichier JSON local"""
+    return get_snapshot().matches
+
+ODDS_1X2_LABELS = {1: "1", 2: "2", 3: "X"}
+
+class Match:
+    """Match normalisé une seule fois à l'ingestion, partagé par toutes les routes."""
+    FIELDS = (
+        "id", "team1", "team2", "league", "sport", "score1", "score2", "minute",
+        "status", "is_live", "is_finished", "is_upcoming", "start_ts",
+        "odds", "temp", "humid", "stats", "markets",
+    )
+    __slots__ = FIELDS[:-1] + ("_markets",)
+
+    def __init__(self, **fields):
+        for name in self.FIELDS:
+            setattr(self, name, fields.get(name))
+
+    @property
+    def markets(self):
+        """Marchés (G, T, P, C) ; décodés à la première lecture s'ils viennent d'un snapshot binaire"""
+        markets = self._markets
+        if not isinstance(markets, tuple):
+            markets = self._markets = _decode_markets(markets)
+        return markets
+
+    @markets.setter
+    def markets(self, value):
+        self._markets = value
+
+    def iter_markets(self):
+        """Marchés décodés sans les garder sur le match : les parcours de tout le flux
+        laissent les pages du snapshot partagé intactes (pas de copie par worker)"""
+        markets = self._markets
+        return markets if isinstance(markets, tuple) else _decode_markets(markets)
+
+    def same_markets(self, other):
+        """Compare les marchés de deux versions d'un match ; octets bruts contre octets bruts si aucun n'est décodé"""
+        mine, theirs = self._markets, other._markets
+        if isinstance(mine, tuple) or isinstance(theirs, tuple):
+            return self.iter_markets() == other.iter_markets()
+        return mine == theirs
+
+    @property
+    def render_key(self):
+        """Ce qui est affiché dans la ligne du tableau : le fragment est re-rendu seulement s'il change"""
+        return (self.score1, self.score2, self.status, self.odds,
+                self.team1, self.team2, self.league, self.start_ts, self.temp, self.humid)
+
+    @property
+    def datetime(self):
+        if not self.start_ts:
+            return "–"
+        return datetime.datetime.utcfromtimestamp(self.start_ts).strftime('%d/%m/%Y %H:%M')
+
+    @property
+    def formatted_odds(self):
+        if not self.odds:
+            return ["Pas de cotes disponibles"]
+        return [f"{label}: {cote}" for label, cote in self.odds]
+
+    @property
+    def prediction(self):
+        if not self.odds:
+            return "–"
+        best = min(self.odds, key=lambda x: x[1])
+        return {
+            "1": f"{self.team1} gagne",
+            "2": f"{self.team2} gagne",
+            "X": "Match nul"
+        }.get(best[0], "–")
+
+    @property
+    def alternative_markets(self):
+        """Marchés hors 1X2, sous forme (G, T, P, C)"""
+        return [m for m in self.markets if m[0] != 1]
+
+def _parse_score(value):
+    try:
+        return int(value) if value is not None else 0
+    except (TypeError, ValueError):
+        return 0
+
+def normalize_match(raw):
+    """Transforme une entrée brute de `Value` (format 1xbet) en Match."""
+    league = raw.get("LE", "–")
+    sc = raw.get("SC", {})
+
+    # --- Score ---
+    score1 = _parse_score(sc.get("FS", {}).get("S1"))
+    score2 = _parse_score(sc.get("FS", {}).get("S2"))
+
+    # --- Minute ---
+    minute = None
+    # Prendre d'abord SC.TS (temps écoulé en secondes)
+    if "TS" in sc and isinstance(sc["TS"], int):
+        minute = sc["TS"] // 60
+    elif "ST" in sc and isinstance(sc["ST"], int):
+        minute = sc["ST"]
+    elif "T" in raw and isinstance(raw["T"], int):
+        minute = raw["T"] // 60
+
+    # --- Statut ---
+    tn = raw.get("TN", "").lower()
+    tns = raw.get("TNS", "").lower()
+    tt = sc.get("TT")
+    statut = "À venir"
+    is_live = False
+    is_finished = False
+    if (minute is not None and minute > 0) or (score1 > 0 or score2 > 0):
+        statut = f"En cours ({minute}′)" if minute else "En cours"
+        is_live = True
+    if ("terminé" in tn or "terminé" in tns) or (tt == 3):
+        statut = "Terminé"
+        is_live = False
+        is_finished = True
+
+    # --- Marchés (G, T, P, C) : E puis AE ---
+    markets = []
+    for o in raw.get("E", []):
+        if o.get("C") is not None:
+            markets.append((o.get("G"), o.get("T"), o.get("P"), o.get("C")))
+    for ae in raw.get("AE", []):
+        for o in ae.get("ME", []):
+            if o.get("C") is not None:
+                markets.append((o.get("G", ae.get("G")), o.get("T"), o.get("P"), o.get("C")))
+
+    # --- Cotes 1X2 : E (G=1) sinon AE ---
+    odds = [(ODDS_1X2_LABELS[o.get("T")], o.get("C")) for o in raw.get("E", [])
+            if o.get("G") == 1 and o.get("T") in ODDS_1X2_LABELS and o.get("C") is not None]
+    if not odds:
+        for ae in raw.get("AE", []):
+            if ae.get("G") == 1:
+                odds.extend((ODDS_1X2_LABELS[o.get("T")], o.get("C")) for o in ae.get("ME", [])
+                            if o.get("T") in ODDS_1X2_LABELS and o.get("C") is not None)
+
+    # --- Météo ---
+    meteo_data = raw.get("MIS", [])
+    temp = next((item["V"] for item in meteo_data if item.get("K") == 9), "–")
+    humid = next((item["V"] for item in meteo_data if item.get("K") == 27), "–")
+
+    # --- Statistiques avancées ---
+    stats = []
+    st = sc.get("ST", [])
+    if st and isinstance(st, list) and "Value" in st[0]:
+        for stat in st[0]["Value"]:
+            stats.append({"nom": stat.get("N", "?"), "s1": stat.get("S1", "0"), "s2": stat.get("S2", "0")})
+
+    return Match(
+        id=raw.get("I"),
+        team1=raw.get("O1", "–"),
+        team2=raw.get("O2", "–"),
+        league=league,
+        sport=detect_sport(league).strip(),
+        score1=score1,
+        score2=score2,
+        minute=minute,
+        status=statut,
+        is_live=is_live,
+        is_finished=is_finished,
+        is_upcoming=statut == "À venir",
+        start_ts=raw.get("S", 0),
+        odds=tuple(odds),
+        temp=temp,
+        humid=humid,
+        stats=stats,
+        markets=tuple(markets),
+    )
+
+def normalize_feed(raw_matches):
+    """Normalise tout le flux ; les entrées illisibles sont ignorées."""
+    matches = []
+    for raw in raw_matches:
+        try:
+            matches.append(normalize_match(raw))
+        except Exception as e:
+            print(f"Erreur lors du traitement d'un match: {e}")
+    return matches
+
+def match_row(match, book=None):
+    """Ligne du tableau de la page d'accueil pour un match (`book` : son marché 1X2 analysé)"""
+    return {
+        "team1": match.team1,
+        "team2": match.team2,
+        "score1": match.score1,
+        "score2": match.score2,
+        "league": match.league,
+        "sport": match.sport,
+        "status": match.status,
+        "datetime": match.datetime,
+        "temp": match.temp,
+        "humid": match.humid,
+        "odds": match.formatted_odds,
+        "prediction": match.prediction,
+        "probability": probability_text(book),
+        "id": match.id
+    }
+
+STATIC_MAX_AGE = 365 * 24 * 3600
+_asset_digests = {}
+
+def asset_url(filename):
+    """URL d'un fichier statique avec empreinte de contenu, mise en cache un an par le navigateur"""
+    digest = _asset_digests.get(filename)
+    if digest is None:
+        with open(os.path.join(app.static_folder, filename), 'rb') as file:
+            digest = _asset_digests[filename] = hashlib.sha1(file.read()).hexdigest()[:12]
+    return f"{app.static_url_path}/{filename}?v={digest}"
+
+app.jinja_env.globals["asset_url"] = asset_url
+
+@app.after_request
+def static_cache_headers(response):
+    """Cache immuable pour les fichiers statiques demandés avec leur empreinte courante"""
+    if request.endpoint == "static" and response.status_code == 200:
+        filename = (request.view_args or {}).get("filename")
+        if filename in _asset_digests and request.args.get("v") == _asset_digests[filename]:
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = STATIC_MAX_AGE
+            response.cache_control.immutable = True
+    return response
+
+RESPONSE_CACHE_SIZE = int(os.environ.get("RESPONSE_CACHE_SIZE", 256))
+
+class CachedPage:
+    """Page rendue, son ETag fort et ses variantes compressées (calculées une seule fois)"""
+    __slots__ = ("body", "etag", "encoded", "mimetype")
+
+    def __init__(self, body, mimetype="text/html"):
+        self.body = body.encode("utf-8") if isinstance(body, str) else body
+        self.mimetype = mimetype
+        self.etag = hashlib.sha1(self.body).hexdigest()
+        self.encoded = {}
+
+    def encode(self, encoding):
+        """Corps compressé pour `encoding` ("br" ou "gzip"), mis en cache avec la page"""
+        data = self.encoded.get(encoding)
+        if data is None:
+            if encoding == "br":
+                data = brotli.compress(self.body, quality=9)
+            else:
+                data = gzip.compress(self.body, compresslevel=9)
+            self.encoded[encoding] = data
+        return data
+
+def negotiate_encoding():
+    """Meilleur encodage accepté par le client parmi ceux qu'on sait produire"""
+    offered = ["br", "gzip"] if brotli is not None else ["gzip"]
+    return request.accept_encodings.best_match(offered)
+
+class ResponseCache:
+    """Cache LRU borné des pages complètes, indexé par filtres + version du snapshot."""
+
+    def __init__(self, maxsize=RESPONSE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return {"size": len(self._entries), "maxsize": self.maxsize, "hits": self.hits,
+                "misses": self.misses, "not_modified": self.not_modified}
+
+response_cache = ResponseCache()
+
+def serve_cached(key, render, mimetype="text/html"):
+    """Sert une page depuis le cache (ou la rend une fois) avec ETag et 304 si If-None-Match correspond"""
+    entry = response_cache.get(key)
+    if entry is None:
+        entry = response_cache.put(key, CachedPage(render(), mimetype))
+    encoding = negotiate_encoding()
+    if encoding:
+        response = Response(entry.encode(encoding), mimetype=entry.mimetype)
+        response.content_encoding = encoding
+        # Une représentation différente par encodage, donc un ETag différent
+        response.set_etag(f"{entry.etag}-{encoding}")
+    else:
+        response = Response(entry.body, mimetype=entry.mimetype)
+        response.set_etag(entry.etag)
+    response.vary.add("Accept-Encoding")
+    # Le navigateur revalide à chaque fois : 304 tant que le flux n'a pas changé
+    response.cache_control.no_cache = True
+    response.make_conditional(request)
+    if response.status_code == 304:
+        response_cache.not_modified += 1
+    return response
+
+@app.route('/')
+def home():
+    try:
+        selected_sport = request.args.get("sport", "").strip()
+        selected_league = request.args.get("league", "").strip()
+        selected_status = request.args.get("status", "").strip()
         try:
             page = int(request.args.get('page', 1))
-        except:
+        except (TypeError, ValueError):
             page = 1
-        per_page = 20
-        total = len(data)
-        total_pages = (total + per_page - 1) // per_page
-        data_paginated = data[(page-1)*per_page:page*per_page]
-
-        return render_template_string(TEMPLATE, data=data_paginated,
-            sports=sorted(sports_detected),
-            leagues=sorted(leagues_detected),
-            selected_sport=selected_sport or "Tous",
-            selected_league=selected_league or "Toutes",
-            selected_status=selected_status or "Tous",
-            page=page,
-            total_pages=total_pages
-        )
+        per_page = parse_per_page(request.args.get('per_page', DEFAULT_PER_PAGE))
+        try:
+            after = int(request.args['after']) if request.args.get('after') else None
+        except ValueError:
+            after = None
+
+        # Utiliser le fichier JSON local
+        snapshot = get_snapshot()
+        age = stale_minutes(snapshot)
+        key = ("home", selected_sport, selected_league, selected_status, page, per_page, after,
+               snapshot.version, age)
+        return serve_cached(key, lambda: render_home(
+            snapshot, selected_sport, selected_league, selected_status, page, per_page, after, age))
 
     except Exception as e:
         return f"Erreur : {e}"
 
+def render_home(snapshot, selected_sport, selected_league, selected_status, page, per_page, after, age):
+    """HTML de la page d'accueil ; seules les lignes de la page demandée sont construites"""
+    matches = snapshot.matches
+    selected = snapshot.select(selected_sport, selected_league, selected_status)
+    positions, page, total_pages, total = paginate(snapshot, selected, page, per_page, after)
+    row_cache.sync(snapshot)
+    analytics = feed_analytics(snapshot)
+    rows = Markup("".join(row_cache.render(matches[pos], analytics) for pos in positions))
+    next_cursor = matches[positions[-1]].id if positions and page < total_pages else None
+
+    return compiled_template("home").render(rows=rows,
+        rows_count=len(positions),
+        sports=snapshot.sports,
+        leagues=snapshot.leagues,
+        selected_sport=selected_sport or "Tous",
+        selected_league=selected_league or "Toutes",
+        selected_status=selected_status or "Tous",
+        page=page,
+        total_pages=total_pages,
+        per_page=per_page,
+        next_cursor=next_cursor,
+        stale_minutes=age,
+        version=update_hub.event_id(snapshot.version)
+    )
+
+@app.route('/feed/stats')
+def feed_stats():
+    """État de l'ingestion : snapshot courant, disjoncteur et durées du dernier fan-out"""
+    snapshot = feed_store.current
+    return jsonify({
+        "version": snapshot.version,
+        "source": snapshot.source,
+        "matches": len(snapshot.matches),
+        "base_version": snapshot.base_version,
+        "changes": len(snapshot.changes) if snapshot.changes is not None else None,
+        "age_seconds": round(time.time() - snapshot.loaded_at, 1) if snapshot.loaded_at else None,
+        "breaker": feed_poller.breaker.state,
+        "fetches": [t.to_dict() for t in feed_poller.fanout.timings] if feed_poller.fanout else [],
+        "events": feed_poller.scheduler.stats() if feed_poller.scheduler else None,
+    })
+
+@app.route('/cache/stats')
+def cache_stats():
+    """Compteurs des caches de pages et de lignes"""
+    return jsonify({
+        "pages": response_cache.stats(),
+        "rows": {"hits": row_cache.hits, "misses": row_cache.misses},
+        "odds_history": odds_history.stats(),
+        "snapshot_version": feed_store.version,
+    })
+
 def detect_sport(league_name):
     league = league_name.lower()
     if any(word in league for word in ["wta", "atp", "tennis"]):
@@ -293,105 +1690,525 @@ def traduire_pari_type_groupe(type_pari, groupe, param, team1=None, team2=None):
     # Ajoute d'autres mappings selon tes observations
     return f"Pari spécial (G{groupe} T{type_pari})"
 
+def alternative_bets(match):
+    """Paris alternatifs (E puis AE, hors 1X2) avec une cote entre 1.499 et 3, et la prédiction alternative"""
+    team1, team2 = match.team1, match.team2
+    paris_alternatifs = []
+    for groupe, type_pari, param, cote in match.alternative_markets:
+        paris_alternatifs.append({
+            "nom": traduire_pari_type_groupe(type_pari, groupe, param, team1, team2),
+            "valeur": param if param is not None else "",
+            "cote": cote
+        })
+    # Filtrer les paris alternatifs selon la cote demandée
+    paris_alternatifs = [p for p in paris_alternatifs if 1.499 <= float(p["cote"]) <= 3]
+    # Sélection de la prédiction alternative la plus probable (cote la plus basse)
+    prediction_alt = None
+    if paris_alternatifs:
+        meilleur_pari = min(paris_alternatifs, key=lambda x: x["cote"])
+        prediction_alt = f"{meilleur_pari['nom']} ({meilleur_pari['valeur']}) à {meilleur_pari['cote']}"
+    return paris_alternatifs, prediction_alt
+
+# --- Probabilités implicites et marge du bookmaker ---
+
+TOTAL_GROUPS = (8, 17, 62)  # Plus/Moins : T9 = plus de, T10 = moins de, P = seuil
+
+def implied_probabilities(rows):
+    """Pour des marchés de même taille (une ligne de cotes par marché) :
+    probabilités implicites, overround (somme des 1/cote) et probabilités
+    équitables (marge retirée proportionnellement). Un seul passage NumPy.
+    """
+    if not rows:
+        return [], [], []
+    if np is not None:
+        implied = 1.0 / np.asarray(rows, dtype=np.float64)
+        overround = implied.sum(axis=1)
+        fair = implied / overround[:, None]
+        return implied.tolist(), overround.tolist(), fair.tolist()
+    implied = [[1.0 / c for c in row] for row in rows]
+    overround = [sum(row) for row in implied]
+    fair = [[p / total for p in row] for row, total in zip(implied, overround)]
+    return implied, overround, fair
+
+def market_book(market, group, line, labels, odds, implied, overround, fair):
+    """Un marché complet prêt pour le JSON et les gabarits"""
+    return {
+        "market": market,
+        "group": group,
+        "line": line,
+        "overround": round(overround, 4),
+        "margin": round(overround - 1, 4),
+        "outcomes": [{"label": label, "odds": c, "implied": round(p, 4), "fair": round(f, 4)}
+                     for label, c, p, f in zip(labels, odds, implied, fair)],
+    }
+
+class FeedAnalytics:
+    """Probabilités de tous les marchés complets d'un snapshot : 1X2 et Plus/Moins.
+
+    Les cotes sont regroupées par taille de marché et calculées en un passage
+    vectorisé ; les dictionnaires par match ne sont construits qu'à la demande.
+    """
+
+    def __init__(self, snapshot):
+        self.version = snapshot.version
+        ids, rows = [], []
+        total_ids, total_keys, total_rows = [], [], []
+        for match in snapshot.matches:
+            if match.id is None:
+                continue
+            if len(match.odds) == 3:
+                odds = dict(match.odds)
+                row = (odds.get("1"), odds.get("X"), odds.get("2"))
+                if all(c is not None and c > 1 for c in row):
+                    ids.append(match.id)
+                    rows.append(row)
+            sides = {}
+            for g, t, p, c in match.iter_markets():
+                if g in TOTAL_GROUPS and t in (9, 10) and p is not None and c > 1:
+                    sides.setdefault((g, p), {})[t] = c
+            for key, pair in sides.items():
+                if len(pair) == 2:
+                    total_ids.append(match.id)
+                    total_keys.append(key)
+                    total_rows.append((pair[9], pair[10]))
+
+        self._x12_index = dict(zip(ids, range(len(ids))))
+        self._x12 = (rows,) + implied_probabilities(rows)
+        self._total_index = {}
+        for i, match_id in enumerate(total_ids):
+            self._total_index.setdefault(match_id, []).append(i)
+        self._total_keys = total_keys
+        self._totals = (total_rows,) + implied_probabilities(total_rows)
+        self._books = {}
+
+    def markets(self, match_id):
+        """Marchés complets d'un match (liste vide si aucun)"""
+        books = self._books.get(match_id)
+        if books is None:
+            books = []
+            i = self._x12_index.get(match_id)
+            if i is not None:
+                rows, implied, overround, fair = self._x12
+                books.append(market_book("1x2", 1, None, ("1", "X", "2"), rows[i], implied[i], overround[i], fair[i]))
+            rows, implied, overround, fair = self._totals
+            for i in self._total_index.get(match_id, ()):
+                g, p = self._total_keys[i]
+                books.append(market_book("total", g, p, ("Plus", "Moins"), rows[i], implied[i], overround[i], fair[i]))
+            self._books[match_id] = books
+        return books
+
+    def one_x_two(self, match_id):
+        """Le marché 1X2 d'un match, ou None"""
+        books = self.markets(match_id)
+        if books and books[0]["market"] == "1x2":
+            return books[0]
+        return None
+
+_analytics = None
+_analytics_lock = threading.Lock()
+
+def feed_analytics(snapshot):
+    """Analyse du snapshot, calculée une seule fois par version"""
+    global _analytics
+    analytics = _analytics
+    if analytics is None or analytics.version != snapshot.version:
+        with _analytics_lock:
+            analytics = _analytics
+            if analytics is None or analytics.version != snapshot.version:
+                analytics = _analytics = FeedAnalytics(snapshot)
+    return analytics
+
+def one_x_two_book(match):
+    """Marché 1X2 d'un seul match, hors analyse du snapshot (mises à jour en direct)"""
+    odds = dict(match.odds)
+    row = (odds.get("1"), odds.get("X"), odds.get("2"))
+    if not all(c is not None and c > 1 for c in row):
+        return None
+    implied, overround, fair = implied_probabilities([row])
+    return market_book("1x2", 1, None, ("1", "X", "2"), row, implied[0], overround[0], fair[0])
+
+def probability_text(book):
+    """Probabilité équitable de l'issue la plus probable et marge du bookmaker, pour l'affichage"""
+    if book is None:
+        return None
+    best = max(book["outcomes"], key=lambda o: o["fair"])
+    return f"{round(best['fair'] * 100)} % · marge {round(book['margin'] * 100, 1)} %"
+
+# --- Modèle de Poisson des scores (football) ---
+
+POISSON_MAX_GOALS = 10
+POISSON_DEFAULT_TOTAL = 2.6  # buts attendus quand le flux n'a pas de marché Plus/Moins exploitable
+POISSON_BISECTIONS = 30
+
+class ScoreModel:
+    """Buts attendus par équipe ajustés sur les cotes 1X2 et Plus/Moins, et matrice des scores.
+
+    Chaque équipe marque selon une loi de Poisson indépendante. Le total
+    attendu vient de la ligne Plus/Moins la plus équilibrée (sinon de la
+    probabilité du nul), puis la répartition entre équipes reproduit l'écart
+    victoire domicile / victoire extérieur. L'ajustement est fait en un seul
+    lot NumPy pour tous les matchs dont les cotes ont changé ; les autres
+    gardent leur résultat. Sans NumPy, le modèle est désactivé.
+    """
+
+    def __init__(self, max_goals=POISSON_MAX_GOALS):
+        self.max_goals = max_goals
+        self._fits = {}
+        self._version = None
+        self._lock = threading.Lock()
+        if np is not None:
+            goals = np.arange(max_goals + 1)
+            self._goals = goals
+            self._log_factorial = np.concatenate(([0.0], np.cumsum(np.log(np.arange(1, max_goals + 1)))))
+            home, away = np.meshgrid(goals, goals, indexing="ij")
+            self._home_win = home > away
+            self._draw = home == away
+            self._away_win = home < away
+            self._both_score = (home > 0) & (away > 0)
+            self._total = home + away
+
+    def _pmf(self, lam):
+        """Loi de Poisson tronquée à max_goals, une ligne par match"""
+        lam = lam[:, None]
+        return np.exp(self._goals * np.log(lam) - lam - self._log_factorial)
+
+    def _matrices(self, mu, share):
+        return self._pmf(mu * share)[:, :, None] * self._pmf(mu * (1 - share))[:, None, :]
+
+    def _outcomes(self, mu, share):
+        """(victoire domicile, nul, victoire extérieur) sans construire les matrices"""
+        home = self._pmf(mu * share)
+        away = self._pmf(mu * (1 - share))
+        home_cdf = np.cumsum(home, axis=1)
+        away_cdf = np.cumsum(away, axis=1)
+        return ((home[:, 1:] * away_cdf[:, :-1]).sum(axis=1), (home * away).sum(axis=1),
+                (away[:, 1:] * home_cdf[:, :-1]).sum(axis=1))
+
+    def _solve(self, f, low, high, n):
+        """Bisection vectorisée pour une fonction croissante de son argument"""
+        low = np.full(n, low)
+        high = np.full(n, high)
+        for _ in range(POISSON_BISECTIONS):
+            mid = (low + high) / 2
+            above = f(mid) > 0
+            high = np.where(above, mid, high)
+            low = np.where(above, low, mid)
+        return (low + high) / 2
+
+    def fit(self, rows, lines):
+        """Buts attendus (domicile, extérieur) pour des cotes 1X2 et une ligne (seuil, cote plus, cote moins) ou None"""
+        n = len(rows)
+        _, _, fair = implied_probabilities(rows)
+        fair = np.asarray(fair)
+        supremacy = fair[:, 0] - fair[:, 2]
+        draw = fair[:, 1]
+        has_line = np.array([line is not None for line in lines])
+        threshold = np.array([line[0] if line else 0.0 for line in lines])
+        _, _, over = implied_probabilities([line[1:] if line else (2.0, 2.0) for line in lines])
+        over = np.asarray(over)[:, 0]
+
+        # Total de buts : la somme de deux Poisson est une Poisson de moyenne mu
+        def total_gap(mu):
+            pmf = self._pmf(mu)
+            return (pmf * (self._goals > threshold[:, None])).sum(axis=1) - over
+        mu = np.where(has_line, self._solve(total_gap, 0.1, 8.0, n), POISSON_DEFAULT_TOTAL)
+
+        def share_for(mu):
+            def gap(share):
+                home, _, away = self._outcomes(mu, share)
+                return home - away - supremacy
+            return self._solve(gap, 0.02, 0.98, n)
+        share = share_for(mu)
+        # Sans ligne Plus/Moins, le total est celui qui reproduit la probabilité du nul
+        if not has_line.all():
+            for _ in range(3):
+                def draw_gap(candidate):
+                    return draw - self._outcomes(candidate, share)[1]
+                mu = np.where(has_line, mu, self._solve(draw_gap, 0.1, 8.0, n))
+                share = share_for(mu)
+        return mu * share, mu * (1 - share)
+
+    def describe(self, home, away):
+        """Probabilités dérivées des buts attendus : scores exacts, 1X2, BTTS, Plus/Moins"""
+        size = self.max_goals + 1
+        flat = self._matrices(home + away, home / (home + away)).reshape(len(home), -1)
+        top = np.argsort(-flat, axis=1)[:, :5]
+        top_p = np.take_along_axis(flat, top, axis=1)
+        outcomes = np.stack([flat @ self._home_win.ravel(), flat @ self._draw.ravel(),
+                             flat @ self._away_win.ravel(), flat @ self._both_score.ravel()], axis=1)
+        # P(total > k + 0.5) pour k = 0..4
+        by_total = flat @ (self._total.ravel()[:, None] == np.arange(2 * size - 1)).astype(np.float64)
+        over = 1 - np.cumsum(by_total, axis=1)[:, :5]
+        results = []
+        for lam1, lam2, scores, score_p, (p1, px, p2, btts), overs in zip(
+                home.round(2).tolist(), away.round(2).tolist(), top.tolist(), top_p.round(4).tolist(),
+                outcomes.round(4).tolist(), over.round(4).tolist()):
+            results.append({
+                "expected_goals": [lam1, lam2],
+                "scores": [{"score": f"{i // size}-{i % size}", "probability": p} for i, p in zip(scores, score_p)],
+                "1x2": {"1": p1, "X": px, "2": p2},
+                "btts": btts,
+                "over": {f"{k}.5": p for k, p in enumerate(overs)},
+            })
+        return results
+
+    def update(self, snapshot):
+        """Réajuste les matchs de football dont les cotes ont changé depuis le dernier snapshot"""
+        if np is None or snapshot.version == self._version:
+            return
+        with self._lock:
+            if snapshot.version == self._version:
+                return
+            fits = {}
+            pending, rows, lines = [], [], []
+            for match in snapshot.matches:
+                if match.id is None or match.sport != "Football" or len(match.odds) != 3:
+                    continue
+                cached = self._fits.get(match.id)
+                if cached is not None and (cached[0] is match or cached[0].same_markets(match)):
+                    # On garde le match courant : l'ancien retiendrait la projection du snapshot précédent
+                    fits[match.id] = (match, cached[1])
+                    continue
+                odds = dict(match.odds)
+                row = (odds.get("1"), odds.get("X"), odds.get("2"))
+                if not all(c is not None and c > 1 for c in row):
+                    continue
+                pending.append((match.id, match))
+                rows.append(row)
+                lines.append(self._main_line(match))
+            if pending:
+                home, away = self.fit(rows, lines)
+                for (match_id, fitted), result in zip(pending, self.describe(home, away)):
+                    fits[match_id] = (fitted, result)
+            self._fits = fits
+            self._version = snapshot.version
+
+    @staticmethod
+    def _main_line(match):
+        """Ligne Plus/Moins la plus équilibrée (seuil en demi-but), ou None"""
+        sides = {}
+        for g, t, p, c in match.iter_markets():
+            if g in TOTAL_GROUPS and t in (9, 10) and p is not None and c > 1 and p % 1 == 0.5:
+                sides.setdefault(p, {})[t] = c
+        lines = [(p, pair[9], pair[10]) for p, pair in sides.items() if len(pair) == 2]
+        if not lines:
+            return None
+        return min(lines, key=lambda line: abs(line[1] - line[2]))
+
+    def predict(self, snapshot, match_id):
+        """Prédictions du modèle pour un match du snapshot, ou None"""
+        self.update(snapshot)
+        cached = self._fits.get(match_id)
+        return cached[1] if cached is not None else None
+
+score_model = ScoreModel()
+
+# --- Arbitrages entre marchés d'un même match ---
+
+# Issue simple complémentaire de chaque double chance (G3) : 12 / X, 1X / 2, X2 / 1
+DOUBLE_CHANCE_COMPLEMENTS = {1: (1, 3, None), 2: (1, 2, None), 3: (1, 1, None)}
+# Handicaps (G2) : l'équipe 1 à +h et l'équipe 2 à -h couvrent toutes les issues pour un demi-but
+HANDICAP_PAIRS = ((1, 2), (7, 8))
+
+def complementary_sets(match):
+    """Ensembles d'issues complémentaires d'un match : [(type, ((G, T, P), ...), (cote, ...))]"""
+    prices = {(g, t, p): c for g, t, p, c in match.iter_markets() if c is not None and c > 1}
+    for label, cote in match.odds:
+        if cote is not None and cote > 1:
+            prices.setdefault((1, {"1": 1, "X": 3, "2": 2}[label], None), cote)
+    sets = []
+    keys = ((1, 1, None), (1, 3, None), (1, 2, None))
+    if all(key in prices for key in keys):
+        sets.append(("1x2", keys))
+    for t, single in DOUBLE_CHANCE_COMPLEMENTS.items():
+        if (3, t, None) in prices and single in prices:
+            sets.append(("double chance", ((3, t, None), single)))
+    for g, t, p in prices:
+        if g in TOTAL_GROUPS and t == 9 and (g, 10, p) in prices:
+            sets.append(("total", ((g, 9, p), (g, 10, p))))
+        elif g == 2 and p is not None and p % 1 == 0.5:
+            for first, second in HANDICAP_PAIRS:
+                if t == first and (2, second, -p) in prices:
+                    sets.append(("handicap", ((2, first, p), (2, second, -p))))
+    return [(kind, legs, tuple(prices[key] for key in legs)) for kind, legs in sets]
+
+class ArbitrageDetector:
+    """Repère les ensembles d'issues complémentaires dont la somme des 1/cote est sous 1.
+
+    Abonné du SnapshotStore : seuls les matchs nouveaux, terminés ou dont les
+    cotes ont changé dans le nouveau snapshot sont réévalués, en un lot par taille
+    d'ensemble ; si la chaîne de versions est rompue, tout le flux est repris.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self.evaluated = 0
+        self._found = {}
+        self._lock = threading.Lock()
+
+    def update(self, snapshot, previous):
+        with self._lock:
+            if snapshot.changes is not None and snapshot.base_version == self.version:
+                found = dict(self._found)
+                ids = []
+                for delta in snapshot.changes:
+                    # Score, minute ou libellé de statut seuls ne changent pas les opportunités : on les garde
+                    if delta.kind == "removed":
+                        found.pop(delta.id, None)
+                    elif delta.kind == "added" or delta.odds or (
+                            delta.status and snapshot.by_id[delta.id].is_finished != previous.by_id[delta.id].is_finished):
+                        found.pop(delta.id, None)
+                        ids.append(delta.id)
+            else:
+                found = {}
+                ids = list(snapshot.by_id)
+            found.update(self.evaluate(snapshot, ids))
+            self._found = found
+            self.version = snapshot.version
+            self.evaluated += len(ids)
+
+    @staticmethod
+    def evaluate(snapshot, ids):
+        """{id: [opportunités]} pour les matchs `ids`, calculé en un passage par taille d'ensemble"""
+        by_size = {}
+        for match_id in ids:
+            match = snapshot.by_id.get(match_id)
+            if match is None or match.is_finished:
+                continue
+            for kind, legs, odds in complementary_sets(match):
+                by_size.setdefault(len(legs), []).append((match, kind, legs, odds))
+        found = {}
+        for candidates in by_size.values():
+            _, overrounds, _ = implied_probabilities([odds for _, _, _, odds in candidates])
+            for (match, kind, legs, odds), overround in zip(candidates, overrounds):
+                if overround < 1:
+                    found.setdefault(match.id, []).append(arbitrage(match, kind, legs, odds, overround))
+        return found
+
+    def opportunities(self, match_id=None):
+        """Opportunités d'un match, ou de tout le flux de la plus rentable à la moins rentable"""
+        found = self._found
+        if match_id is not None:
+            return found.get(match_id, [])
+        return sorted((o for items in found.values() for o in items), key=lambda o: o["margin"], reverse=True)
+
+def arbitrage(match, kind, legs, odds, overround):
+    """Une opportunité : marge garantie et répartition des mises (parts de la mise totale)"""
+    return {
+        "id": match.id,
+        "team1": match.team1,
+        "team2": match.team2,
+        "league": match.league,
+        "sport": match.sport,
+        "kind": kind,
+        "margin": round(1 / overround - 1, 4),
+        "legs": [{"market": [g, t, p], "nom": traduire_pari_type_groupe(t, g, p, match.team1, match.team2),
+                  "cote": cote, "stake": round(1 / cote / overround, 4)}
+                 for (g, t, p), cote in zip(legs, odds)],
+    }
+
+arbitrage_detector = ArbitrageDetector()
+feed_store.subscribe(arbitrage_detector.update)
+
 @app.route('/match/<int:match_id>')
 def match_details(match_id):
+    # Récupérer les données depuis le fichier JSON local
+    snapshot = get_snapshot()
+    age = stale_minutes(snapshot)
+    match = snapshot.by_id.get(match_id)
+    if match is None:
+        return f"Aucun match trouvé pour l'identifiant {match_id}", 404
+    books = feed_analytics(snapshot).markets(match_id)
+    poisson = score_model.predict(snapshot, match_id)
+    arbitrages = arbitrage_detector.opportunities(match_id)
+    return serve_cached(("match", match_id, snapshot.version, age),
+                        lambda: render_match_details(match, age, books, poisson, arbitrages))
+
+def render_match_details(match, age, books=(), poisson=None, arbitrages=()):
+    """HTML de la page de détails d'un match.
+
+    `books` : ses marchés complets analysés ; `poisson` : prédictions du modèle de scores (football) ;
+    `arbitrages` : combinaisons de cotes à gain garanti.
+    """
     try:
-        # Récupérer les données depuis le fichier JSON local
-        matches = load_json_data()
-        match = next((m for m in matches if m.get("I") == match_id), None)
-        if not match:
-            return f"Aucun match trouvé pour l'identifiant {match_id}"
         # Infos principales
-        team1 = match.get("O1", "–")
-        team2 = match.get("O2", "–")
-        league = match.get("LE", "–")
-        sport = detect_sport(league)
-        # Scores
-        score1 = match.get("SC", {}).get("FS", {}).get("S1")
-        score2 = match.get("SC", {}).get("FS", {}).get("S2")
-        try:
-            score1 = int(score1) if score1 is not None else 0
-        except:
-            score1 = 0
-        try:
-            score2 = int(score2) if score2 is not None else 0
-        except:
-            score2 = 0
-        # Statistiques avancées
-        stats = []
-        st = match.get("SC", {}).get("ST", [])
-        if st and isinstance(st, list) and len(st) > 0 and "Value" in st[0]:
-            for stat in st[0]["Value"]:
-                nom = stat.get("N", "?")
-                s1 = stat.get("S1", "0")
-                s2 = stat.get("S2", "0")
-                stats.append({"nom": nom, "s1": s1, "s2": s2})
+        team1 = match.team1
+        team2 = match.team2
+        league = match.league
+        sport = match.sport
+        score1 = match.score1
+        score2 = match.score2
+        stats = match.stats
         # Explication prédiction (simple)
         explication = "La prédiction est basée sur les cotes et les statistiques principales (tirs, possession, etc.)."  # Peut être enrichi
         # Prédiction 1X2
-        odds_data = []
-        for o in match.get("E", []):
-            if o.get("G") == 1 and o.get("T") in [1, 2, 3] and o.get("C") is not None:
-                odds_data.append({
-                    "type": {1: "1", 2: "2", 3: "X"}.get(o.get("T")),
-                    "cote": o.get("C")
-                })
-        if not odds_data:
-            for ae in match.get("AE", []):
-                if ae.get("G") == 1:
-                    for o in ae.get("ME", []):
-                        if o.get("T") in [1, 2, 3] and o.get("C") is not None:
-                            odds_data.append({
-                                "type": {1: "1", 2: "2", 3: "X"}.get(o.get("T")),
-                                "cote": o.get("C")
-                            })
-        prediction = "–"
-        if odds_data:
-            best = min(odds_data, key=lambda x: x["cote"])
-            prediction = {
-                "1": f"{team1} gagne",
-                "2": f"{team2} gagne",
-                "X": "Match nul"
-            }.get(best["type"], "–")
-        # --- Paris alternatifs ---
-        paris_alternatifs = []
-        # 1. E (marchés principaux et alternatifs)
-        for o in match.get("E", []):
-            if o.get("G") != 1 and o.get("C") is not None:
-                type_pari = o.get("T")
-                groupe = o.get("G")
-                param = o.get("P") if "P" in o else None
-                nom_traduit = traduire_pari_type_groupe(type_pari, groupe, param, team1, team2)
-                valeur = param if param is not None else ""
-                cote = o.get("C")
-                paris_alternatifs.append({
-                    "nom": nom_traduit,
-                    "valeur": valeur,
-                    "cote": cote
-                })
-        # 2. AE (marchés alternatifs étendus)
-        for ae in match.get("AE", []):
-            if ae.get("G") != 1:
-                for o in ae.get("ME", []):
-                    if o.get("C") is not None:
-                        type_pari = o.get("T")
-                        groupe = o.get("G")
-                        param = o.get("P") if "P" in o else None
-                        nom_traduit = traduire_pari_type_groupe(type_pari, groupe, param, team1, team2)
-                        valeur = param if param is not None else ""
-                        cote = o.get("C")
-                        paris_alternatifs.append({
-                            "nom": nom_traduit,
-                            "valeur": valeur,
-                            "cote": cote
-                        })
-        # Filtrer les paris alternatifs selon la cote demandée
-        paris_alternatifs = [p for p in paris_alternatifs if 1.499 <= float(p["cote"]) <= 3]
-        # Sélection de la prédiction alternative la plus probable (cote la plus basse)
-        prediction_alt = None
-        if paris_alternatifs:
-            meilleur_pari = min(paris_alternatifs, key=lambda x: x["cote"])
-            prediction_alt = f"{meilleur_pari['nom']} ({meilleur_pari['valeur']}) à {meilleur_pari['cote']}"
+        prediction = match.prediction
+        # Paris alternatifs et prédiction alternative
+        paris_alternatifs, prediction_alt = alternative_bets(match)
+        # Probabilités des marchés complets (1X2, Plus/Moins)
+        lignes_marches = ''.join(
+            f'<tr><td>{"1X2" if b["market"] == "1x2" else "Plus/Moins " + str(b["line"])}</td><td>{o["label"]}</td>'
+            f'<td>{o["odds"]}</td><td>{round(o["implied"] * 100, 1)} %</td>'
+            f'<td><span style="color: #667eea; font-weight: bold;">{round(o["fair"] * 100, 1)} %</span></td>'
+            f'<td>{round(b["margin"] * 100, 1)} %</td></tr>'
+            for b in books for o in b["outcomes"])
+        # Modèle de Poisson : score exact, les deux équipes marquent, total de buts
+        cartes_poisson = ""
+        if poisson:
+            score = poisson["scores"][0]
+            autres_scores = ", ".join(f'{p["score"]} ({round(p["probability"] * 100, 1)} %)' for p in poisson["scores"][1:])
+            plus = poisson["over"]["2.5"]
+            cartes_poisson = f'''
+                        <div class="prediction-card">
+                            <i class="fas fa-bullseye"></i><br>
+                            <strong>Score exact (modèle)</strong><br>
+                            {score["score"]} ({round(score["probability"] * 100, 1)} %)<br>
+                            <small>{autres_scores}</small>
+                        </div>
+                        <div class="prediction-card">
+                            <i class="fas fa-exchange-alt"></i><br>
+                            <strong>Les deux équipes marquent</strong><br>
+                            {"Oui" if poisson["btts"] >= 0.5 else "Non"} ({round(max(poisson["btts"], 1 - poisson["btts"]) * 100, 1)} %)
+                        </div>
+                        <div class="prediction-card">
+                            <i class="fas fa-futbol"></i><br>
+                            <strong>Total de buts</strong><br>
+                            {"Plus" if plus >= 0.5 else "Moins"} de 2.5 buts ({round(max(plus, 1 - plus) * 100, 1)} %)<br>
+                            <small>Buts attendus : {poisson["expected_goals"][0]} - {poisson["expected_goals"][1]}</small>
+                        </div>'''
+        # Arbitrages : marge garantie et répartition des mises
+        bloc_arbitrages = ""
+        if arbitrages:
+            lignes_arbitrages = ''.join(
+                f'<tr><td>{a["kind"]}</td><td>{" + ".join(leg["nom"] for leg in a["legs"])}</td>'
+                f'<td>{" / ".join(str(leg["cote"]) for leg in a["legs"])}</td>'
+                f'<td>{" / ".join(str(round(leg["stake"] * 100, 1)) + " %" for leg in a["legs"])}</td>'
+                f'<td><span style="color: #667eea; font-weight: bold;">{round(a["margin"] * 100, 2)} %</span></td></tr>'
+                for a in arbitrages)
+            bloc_arbitrages = f'''
+                <div class="chart-container">
+                    <div class="chart-title">Arbitrages Détectés</div>
+                    <table class="alt-table">
+                        <tr>
+                            <th><i class="fas fa-tag"></i> Marché</th>
+                            <th><i class="fas fa-list"></i> Issues</th>
+                            <th><i class="fas fa-coins"></i> Cotes</th>
+                            <th><i class="fas fa-balance-scale"></i> Mises</th>
+                            <th><i class="fas fa-percentage"></i> Gain garanti</th>
+                        </tr>
+                        {lignes_arbitrages}
+                    </table>
+                </div>
+'''
+        # Données des graphiques, lues par static/js/match.js
+        match_data = json.dumps({
+            "id": match.id,
+            "team1": team1,
+            "team2": team2,
+            "labels": [s['nom'] for s in stats],
+            "data1": [float(s['s1']) if str(s['s1']).replace('.', '', 1).isdigit() else 0 for s in stats],
+            "data2": [float(s['s2']) if str(s['s2']).replace('.', '', 1).isdigit() else 0 for s in stats],
+        }).replace("</", "<\\/")
         # HTML avec tableau des paris alternatifs
         return f'''
         <!DOCTYPE html>
@@ -402,353 +2219,13 @@ def match_details(match_id):
             <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css" rel="stylesheet">
             <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
             <script src="https://cdn.jsdelivr.net/npm/chartjs-adapter-date-fns/dist/chartjs-adapter-date-fns.bundle.min.js"></script>
-            <style>
-                * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-                
-                body {{ 
-                    font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; 
-                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                    min-height: 100vh;
-                    padding: 20px;
-                }}
-                
-                .container {{ 
-                    max-width: 1200px; 
-                    margin: 0 auto; 
-                    background: rgba(255, 255, 255, 0.95);
-                    border-radius: 20px;
-                    box-shadow: 0 20px 40px rgba(0,0,0,0.1);
-                    backdrop-filter: blur(10px);
-                    padding: 30px;
-                    animation: fadeInUp 0.8s ease-out;
-                }}
-                
-                @keyframes fadeInUp {{
-                    from {{ opacity: 0; transform: translateY(30px); }}
-                    to {{ opacity: 1; transform: translateY(0); }}
-                }}
-                
-                .back-btn {{
-                    display: inline-flex;
-                    align-items: center;
-                    gap: 10px;
-                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                    color: white;
-                    text-decoration: none;
-                    padding: 12px 24px;
-                    border-radius: 25px;
-                    font-weight: bold;
-                    margin-bottom: 30px;
-                    transition: all 0.3s ease;
-                    box-shadow: 0 5px 15px rgba(0,0,0,0.1);
-                }}
-                
-                .back-btn:hover {{
-                    transform: translateY(-2px);
-                    box-shadow: 0 8px 25px rgba(0,0,0,0.2);
-                }}
-                
-                .match-header {{
-                    text-align: center;
-                    margin-bottom: 40px;
-                    padding: 30px;
-                    background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);
-                    border-radius: 20px;
-                    color: white;
-                    box-shadow: 0 15px 35px rgba(0,0,0,0.1);
-                }}
-                
-                .match-header h2 {{
-                    font-size: 2.5em;
-                    margin-bottom: 15px;
-                    text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
-                }}
-                
-                .match-info {{
-                    display: grid;
-                    grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-                    gap: 20px;
-                    margin: 20px 0;
-                }}
-                
-                .info-card {{
-                    background: rgba(255,255,255,0.2);
-                    padding: 15px;
-                    border-radius: 15px;
-                    text-align: center;
-                    backdrop-filter: blur(10px);
-                }}
-                
-                .score-display {{
-                    font-size: 3em;
-                    font-weight: bold;
-                    margin: 20px 0;
-                    text-shadow: 3px 3px 6px rgba(0,0,0,0.3);
-                }}
-                
-                .prediction-section {{
-                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                    color: white;
-                    padding: 25px;
-                    border-radius: 20px;
-                    margin: 30px 0;
-                    box-shadow: 0 15px 35px rgba(0,0,0,0.1);
-                }}
-                
-                .prediction-grid {{
-                    display: grid;
-                    grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
-                    gap: 20px;
-                    margin-top: 20px;
-                }}
-                
-                .prediction-card {{
-                    background: rgba(255,255,255,0.1);
-                    padding: 20px;
-                    border-radius: 15px;
-                    text-align: center;
-                    backdrop-filter: blur(10px);
-                    border: 1px solid rgba(255,255,255,0.2);
-                }}
-                
-                .charts-section {{
-                    display: grid;
-                    grid-template-columns: repeat(auto-fit, minmax(400px, 1fr));
-                    gap: 30px;
-                    margin: 40px 0;
-                }}
-                
-                .chart-container {{
-                    background: white;
-                    border-radius: 20px;
-                    padding: 25px;
-                    box-shadow: 0 15px 35px rgba(0,0,0,0.1);
-                    transition: transform 0.3s ease;
-                }}
-                
-                .chart-container:hover {{
-                    transform: translateY(-5px);
-                }}
-                
-                .chart-title {{
-                    text-align: center;
-                    font-size: 1.5em;
-                    font-weight: bold;
-                    margin-bottom: 20px;
-                    color: #667eea;
-                }}
-                
-                .stats-table, .alt-table {{ 
-                    width: 100%; 
-                    border-collapse: collapse; 
-                    margin-top: 20px;
-                    background: white;
-                    border-radius: 15px;
-                    overflow: hidden;
-                    box-shadow: 0 10px 25px rgba(0,0,0,0.1);
-                }}
-                
-                .stats-table th, .stats-table td, .alt-table th, .alt-table td {{ 
-                    padding: 15px; 
-                    text-align: center; 
-                    border-bottom: 1px solid #eee;
-                }}
-                
-                .stats-table th, .alt-table th {{ 
-                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                    color: white;
-                    font-weight: bold;
-                    font-size: 1.1em;
-                }}
-                
-                .stats-table tr:nth-child(even), .alt-table tr:nth-child(even) {{ 
-                    background-color: #f8f9fa; 
-                }}
-                
-                .stats-table tr:hover, .alt-table tr:hover {{ 
-                    background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);
-                    color: white;
-                    transform: scale(1.02);
-                    transition: all 0.3s ease;
-                }}
-                
-                .contact-box {{ 
-                    background: linear-gradient(135deg, #ff6b6b 0%, #ee5a24 100%);
-                    color: white;
-                    border-radius: 20px; 
-                    margin: 40px auto 0 auto; 
-                    padding: 30px; 
-                    text-align: center; 
-                    font-size: 18px; 
-                    font-weight: bold; 
-                    box-shadow: 0 20px 40px rgba(255, 107, 107, 0.3);
-                    animation: bounceIn 1s ease-out;
-                }}
-                
-                @keyframes bounceIn {{
-                    0% {{ transform: scale(0.3); opacity: 0; }}
-                    50% {{ transform: scale(1.05); }}
-                    70% {{ transform: scale(0.9); }}
-                    100% {{ transform: scale(1); opacity: 1; }}
-                }}
-                
-                .contact-box a {{ 
-                    color: white; 
-                    font-weight: bold; 
-                    text-decoration: none; 
-                    font-size: 20px; 
-                    transition: all 0.3s ease;
-                }}
-                
-                .contact-box a:hover {{
-                    text-shadow: 0 0 10px rgba(255,255,255,0.8);
-                    transform: scale(1.05);
-                }}
-                
-                .progress-bar {{
-                    width: 100%;
-                    height: 20px;
-                    background: #e0e0e0;
-                    border-radius: 10px;
-                    overflow: hidden;
-                    margin: 10px 0;
-                }}
-                
-                .progress-fill {{
-                    height: 100%;
-                    background: linear-gradient(90deg, #667eea, #764ba2);
-                    transition: width 0.3s ease;
-                }}
-                
-                .section-title {{
-                    font-size: 2em;
-                    text-align: center;
-                    margin: 40px 0 20px 0;
-                    color: #667eea;
-                    text-shadow: 2px 2px 4px rgba(0,0,0,0.1);
-                }}
-                
-                @media (max-width: 768px) {{
-                    .container {{ 
-                        padding: 15px; 
-                        margin: 5px; 
-                        border-radius: 15px;
-                    }}
-                    
-                    .match-header {{
-                        padding: 20px;
-                        margin-bottom: 20px;
-                    }}
-                    
-                    .match-header h2 {{ 
-                        font-size: 1.8em; 
-                        margin-bottom: 10px;
-                    }}
-                    
-                    .score-display {{ 
-                        font-size: 2.2em; 
-                        margin: 15px 0;
-                    }}
-                    
-                    .match-info {{
-                        grid-template-columns: 1fr;
-                        gap: 15px;
-                    }}
-                    
-                    .info-card {{
-                        padding: 12px;
-                    }}
-                    
-                    .prediction-section {{
-                        padding: 20px;
-                        margin: 20px 0;
-                    }}
-                    
-                    .prediction-grid {{ 
-                        grid-template-columns: 1fr; 
-                        gap: 15px;
-                    }}
-                    
-                    .prediction-card {{
-                        padding: 15px;
-                    }}
-                    
-                    .charts-section {{ 
-                        grid-template-columns: 1fr; 
-                        gap: 20px;
-                        margin: 20px 0;
-                    }}
-                    
-                    .chart-container {{
-                        padding: 20px;
-                        margin-bottom: 20px;
-                    }}
-                    
-                    .chart-title {{
-                        font-size: 1.3em;
-                        margin-bottom: 15px;
-                    }}
-                    
-                    .section-title {{
-                        font-size: 1.6em;
-                        margin: 30px 0 15px 0;
-                    }}
-                    
-                    .stats-table, .alt-table {{
-                        font-size: 14px;
-                    }}
-                    
-                    .stats-table th, .stats-table td, .alt-table th, .alt-table td {{
-                        padding: 10px;
-                    }}
-                    
-                    .contact-box {{
-                        padding: 20px;
-                        font-size: 16px;
-                        margin: 20px auto;
-                    }}
-                    
-                    .contact-box a {{
-                        font-size: 18px;
-                    }}
-                }}
-                
-                /* Optimisations pour tablettes */
-                @media (min-width: 769px) and (max-width: 1024px) {{
-                    .container {{
-                        max-width: 95%;
-                        padding: 25px;
-                    }}
-                    
-                    .charts-section {{
-                        grid-template-columns: repeat(auto-fit, minmax(350px, 1fr));
-                    }}
-                    
-                    .prediction-grid {{
-                        grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-                    }}
-                }}
-                
-                /* Optimisations pour PC */
-                @media (min-width: 1025px) {{
-                    .container {{
-                        max-width: 1200px;
-                    }}
-                    
-                    .charts-section {{
-                        grid-template-columns: repeat(auto-fit, minmax(400px, 1fr));
-                    }}
-                    
-                    .prediction-grid {{
-                        grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
-                    }}
-                }}
-            </style>
+            <link href="{asset_url('css/match.css')}" rel="stylesheet">
         </head><body>
             <div class="container">
                 <a href="/" class="back-btn">
                     <i class="fas fa-arrow-left"></i> Retour à la liste
                 </a>
+                {f'<p style="background:#fff3cd;color:#856404;border-radius:15px;padding:15px;margin-bottom:20px;text-align:center;font-weight:bold;">Flux en ligne indisponible : données de secours mises à jour il y a {age} min</p>' if age is not None else ''}
                 
                 <div class="match-header">
                     <h2><i class="fas fa-futbol"></i> {team1} vs {team2}</h2>
@@ -767,7 +2244,7 @@ def match_details(match_id):
                         <div class="info-card">
                             <i class="fas fa-clock"></i><br>
                             <strong>Statut</strong><br>
-                            {'En cours' if score1 > 0 or score2 > 0 else 'À venir'}
+                            {match.status}
                         </div>
                     </div>
                 </div>
@@ -784,7 +2261,7 @@ def match_details(match_id):
                             <i class="fas fa-star"></i><br>
                             <strong>Prédiction Alternative</strong><br>
                             {prediction_alt if prediction_alt else 'Aucune disponible'}
-                        </div>
+                        </div>{cartes_poisson}
                     </div>
                     <p style="margin-top: 20px; font-style: italic;">
                         <i class="fas fa-info-circle"></i> {explication}
@@ -808,6 +2285,13 @@ def match_details(match_id):
                         <canvas id="performanceChart" height="300"></canvas>
                     </div>
                 </div>
+
+                <div class="chart-container">
+                    <div class="chart-title">
+                        <i class="fas fa-chart-line"></i> Évolution des Cotes 1X2
+                    </div>
+                    <canvas id="oddsChart" height="300"></canvas>
+                </div>
                 
                 <h3 class="section-title"><i class="fas fa-table"></i> Données Détaillées</h3>
                 
@@ -837,6 +2321,21 @@ def match_details(match_id):
                     </table>
                 </div>
                 
+{bloc_arbitrages}                <div class="chart-container">
+                    <div class="chart-title">Probabilités du Marché</div>
+                    <table class="alt-table">
+                        <tr>
+                            <th><i class="fas fa-tag"></i> Marché</th>
+                            <th><i class="fas fa-hashtag"></i> Issue</th>
+                            <th><i class="fas fa-coins"></i> Cote</th>
+                            <th><i class="fas fa-percentage"></i> Implicite</th>
+                            <th><i class="fas fa-balance-scale"></i> Équitable</th>
+                            <th><i class="fas fa-hand-holding-usd"></i> Marge</th>
+                        </tr>
+                        {lignes_marches}
+                    </table>
+                </div>
+
                 <div class="contact-box">
                     <i class="fas fa-envelope" style="font-size: 24px; margin-right: 10px;"></i>
                     <strong>Contact & Services :</strong><br><br>
@@ -849,159 +2348,512 @@ def match_details(match_id):
                 </div>
             </div>
             
-            <script>
-                // Graphique des statistiques principales
-                const labels = {json.dumps([s['nom'] for s in stats])};
-                const data1 = {json.dumps([float(s['s1']) if str(s['s1']).replace('.', '', 1).isdigit() else 0 for s in stats])};
-                const data2 = {json.dumps([float(s['s2']) if str(s['s2']).replace('.', '', 1).isdigit() else 0 for s in stats])};
-                
-                new Chart(document.getElementById('statsChart'), {{
-                    type: 'bar',
-                    data: {{
-                        labels: labels,
-                        datasets: [
-                            {{
-                                label: '{team1}',
-                                data: data1,
-                                backgroundColor: 'rgba(102, 126, 234, 0.8)',
-                                borderColor: 'rgba(102, 126, 234, 1)',
-                                borderWidth: 2,
-                                borderRadius: 8,
-                                borderSkipped: false,
-                            }},
-                            {{
-                                label: '{team2}',
-                                data: data2,
-                                backgroundColor: 'rgba(118, 75, 162, 0.8)',
-                                borderColor: 'rgba(118, 75, 162, 1)',
-                                borderWidth: 2,
-                                borderRadius: 8,
-                                borderSkipped: false,
-                            }}
-                        ]
-                    }},
-                    options: {{
-                        responsive: true,
-                        maintainAspectRatio: false,
-                        plugins: {{
-                            legend: {{
-                                position: 'top',
-                                labels: {{
-                                    font: {{
-                                        size: 14,
-                                        weight: 'bold'
-                                    }},
-                                    padding: 20
-                                }}
-                            }},
-                            title: {{
-                                display: true,
-                                text: 'Comparaison des Statistiques',
-                                font: {{
-                                    size: 18,
-                                    weight: 'bold'
-                                }}
-                            }}
-                        }},
-                        scales: {{
-                            y: {{
-                                beginAtZero: true,
-                                grid: {{
-                                    color: 'rgba(0,0,0,0.1)'
-                                }}
-                            }},
-                            x: {{
-                                grid: {{
-                                    display: false
-                                }}
-                            }}
-                        }},
-                        animation: {{
-                            duration: 2000,
-                            easing: 'easeInOutQuart'
-                        }}
-                    }}
-                }});
-                
-                // Graphique de performance (donut chart)
-                const total1 = data1.reduce((a, b) => a + b, 0);
-                const total2 = data2.reduce((a, b) => a + b, 0);
-                
-                new Chart(document.getElementById('performanceChart'), {{
-                    type: 'doughnut',
-                    data: {{
-                        labels: ['{team1}', '{team2}'],
-                        datasets: [{{
-                            data: [total1, total2],
-                            backgroundColor: [
-                                'rgba(102, 126, 234, 0.8)',
-                                'rgba(118, 75, 162, 0.8)'
-                            ],
-                            borderColor: [
-                                'rgba(102, 126, 234, 1)',
-                                'rgba(118, 75, 162, 1)'
-                            ],
-                            borderWidth: 3,
-                            hoverOffset: 4
-                        }}]
-                    }},
-                    options: {{
-                        responsive: true,
-                        maintainAspectRatio: false,
-                        plugins: {{
-                            legend: {{
-                                position: 'bottom',
-                                labels: {{
-                                    font: {{
-                                        size: 14,
-                                        weight: 'bold'
-                                    }},
-                                    padding: 20
-                                }}
-                            }},
-                            title: {{
-                                display: true,
-                                text: 'Répartition des Performances',
-                                font: {{
-                                    size: 18,
-                                    weight: 'bold'
-                                }}
-                            }}
-                        }},
-                        animation: {{
-                            duration: 2000,
-                            easing: 'easeInOutQuart'
-                        }}
-                    }}
-                }});
-                
-                // Animation au scroll
-                const observerOptions = {{
-                    threshold: 0.1,
-                    rootMargin: '0px 0px -50px 0px'
-                }};
-                
-                const observer = new IntersectionObserver(function(entries) {{
-                    entries.forEach(entry => {{
-                        if (entry.isIntersecting) {{
-                            entry.target.style.opacity = '1';
-                            entry.target.style.transform = 'translateY(0)';
-                        }}
-                    }});
-                }}, observerOptions);
-                
-                document.querySelectorAll('.chart-container').forEach(el => {{
-                    el.style.opacity = '0';
-                    el.style.transform = 'translateY(30px)';
-                    el.style.transition = 'all 0.6s ease';
-                    observer.observe(el);
-                }});
-            </script>
+            <script id="match-data" type="application/json">{match_data}</script>
+            <script src="{asset_url('js/match.js')}"></script>
         </body></html>
         '''
     except Exception as e:
         return f"Erreur lors de l'affichage des détails du match : {e}"
 
+# --- API JSON ---
+
+MATCH_FIELDS = ("id", "team1", "team2", "league", "sport", "score1", "score2", "minute", "status",
+                "is_live", "is_finished", "is_upcoming", "start_ts", "odds", "temp", "humid", "prediction")
+
+def dumps_json(data):
+    """Sérialisation JSON rapide (orjson si disponible), en octets UTF-8"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def match_to_dict(match, fields=MATCH_FIELDS):
+    """Représentation JSON d'un match normalisé, restreinte aux champs demandés"""
+    data = {}
+    for name in fields:
+        if name == "odds":
+            data["odds"] = dict(match.odds)
+        else:
+            data[name] = getattr(match, name)
+    return data
+
+def api_error(message, status):
+    return jsonify({"error": message}), status
+
+@app.route('/api/matches')
+def api_matches():
+    """Liste des matchs : mêmes filtres que la page d'accueil, pagination par curseur (after=<id>).
+
+    Si le match du curseur a disparu du flux, la réponse est 410 : le client reprend sans `after`.
+    """
+    selected_sport = request.args.get("sport", "").strip()
+    selected_league = request.args.get("league", "").strip()
+    selected_status = request.args.get("status", "").strip()
+    limit = parse_per_page(request.args.get("limit", DEFAULT_PER_PAGE))
+    try:
+        after = int(request.args['after']) if request.args.get('after') else None
+    except ValueError:
+        return api_error("after doit être un identifiant de match", 400)
+    fields = MATCH_FIELDS
+    if request.args.get("fields"):
+        fields = tuple(f.strip() for f in request.args["fields"].split(",") if f.strip())
+        unknown = [f for f in fields if f not in MATCH_FIELDS]
+        if unknown:
+            return api_error(f"Champs inconnus : {', '.join(unknown)}", 400)
+
+    snapshot = get_snapshot()
+    if after is not None and after not in snapshot.positions:
+        # Le match du curseur a quitté le flux : repartir du début renverrait des lignes déjà vues
+        return api_error("Curseur expiré : le match indiqué par after n'est plus dans le flux", 410)
+    key = ("api:matches", selected_sport, selected_league, selected_status, limit, after, fields,
+           snapshot.version)
+
+    def render():
+        selected = snapshot.select(selected_sport, selected_league, selected_status)
+        positions, _, _, total = paginate(snapshot, selected, 1, limit, after)
+        items = [snapshot.matches[pos] for pos in positions]
+        remaining = selected >> (positions[-1] + 1) if positions else 0
+        return dumps_json({
+            "version": snapshot.version,
+            "total": total,
+            "matches": [match_to_dict(m, fields) for m in items],
+            "next_cursor": items[-1].id if items and remaining else None,
+        })
+
+    return serve_cached(key, render, mimetype="application/json")
+
+@app.route('/api/match/<int:match_id>')
+def api_match(match_id):
+    """Détail d'un match : données normalisées, statistiques et paris alternatifs"""
+    snapshot = get_snapshot()
+    match = snapshot.by_id.get(match_id)
+    if match is None:
+        return api_error(f"Aucun match trouvé pour l'identifiant {match_id}", 404)
+
+    def render():
+        paris_alternatifs, prediction_alt = alternative_bets(match)
+        data = match_to_dict(match)
+        data.update({
+            "version": snapshot.version,
+            "stats": match.stats,
+            "paris_alternatifs": paris_alternatifs,
+            "prediction_alt": prediction_alt,
+            "probabilities": feed_analytics(snapshot).markets(match_id),
+            "poisson": score_model.predict(snapshot, match_id),
+            "arbitrages": arbitrage_detector.opportunities(match_id),
+        })
+        return dumps_json(data)
+
+    return serve_cached(("api:match", match_id, snapshot.version), render, mimetype="application/json")
+
+@app.route('/api/probabilities')
+def api_probabilities():
+    """Probabilités implicites, marge et probabilités équitables des marchés complets (mêmes filtres que /api/matches)"""
+    selected_sport = request.args.get("sport", "").strip()
+    selected_league = request.args.get("league", "").strip()
+    selected_status = request.args.get("status", "").strip()
+    snapshot = get_snapshot()
+
+    def render():
+        analytics = feed_analytics(snapshot)
+        selected = snapshot.select(selected_sport, selected_league, selected_status)
+        matches = [snapshot.matches[pos] for pos in bitmap_positions(selected)]
+        return dumps_json({
+            "version": snapshot.version,
+            "matches": [{"id": m.id, "markets": analytics.markets(m.id)} for m in matches if analytics.markets(m.id)],
+        })
+
+    return serve_cached(("api:probabilities", selected_sport, selected_league, selected_status, snapshot.version),
+                        render, mimetype="application/json")
+
+SCANNER_MIN_ODDS = 1.499
+SCANNER_MAX_ODDS = 3.0
+
+def scan_markets(snapshot, selected, min_odds=SCANNER_MIN_ODDS, max_odds=SCANNER_MAX_ODDS, groups=None, limit=DEFAULT_PER_PAGE):
+    """Les `limit` paris alternatifs les plus probables (cote la plus basse) de tout le flux.
+
+    Un seul passage sur les marchés des matchs sélectionnés ; `heapq.nsmallest`
+    ne garde en mémoire qu'un tas de `limit` candidats.
+    """
+    matches = snapshot.matches
+    candidates = (
+        (cote, pos, g, t, p)
+        for pos in bitmap_positions(selected)
+        for g, t, p, cote in matches[pos].iter_markets()
+        if g != 1 and min_odds <= cote <= max_odds and (groups is None or g in groups)
+    )
+    picks = []
+    for cote, pos, g, t, p in heapq.nsmallest(limit, candidates, key=lambda c: c[:2]):
+        match = matches[pos]
+        picks.append({
+            "id": match.id,
+            "team1": match.team1,
+            "team2": match.team2,
+            "league": match.league,
+            "sport": match.sport,
+            "status": match.status,
+            "market": [g, t, p],
+            "nom": traduire_pari_type_groupe(t, g, p, match.team1, match.team2),
+            "valeur": p if p is not None else "",
+            "cote": cote,
+        })
+    return picks
+
+@app.route('/scanner')
+def scanner():
+    """Meilleurs paris alternatifs de tout le flux (mêmes filtres que /api/matches, plus min_odds,
+    max_odds, group=G répétable et limit)"""
+    selected_sport = request.args.get("sport", "").strip()
+    selected_league = request.args.get("league", "").strip()
+    selected_status = request.args.get("status", "").strip()
+    limit = parse_per_page(request.args.get("limit", DEFAULT_PER_PAGE))
+    try:
+        min_odds = float(request.args.get("min_odds", SCANNER_MIN_ODDS))
+        max_odds = float(request.args.get("max_odds", SCANNER_MAX_ODDS))
+        groups = frozenset(int(g) for g in request.args.getlist("group")) or None
+    except ValueError:
+        return api_error("min_odds, max_odds et group doivent être numériques", 400)
+    snapshot = get_snapshot()
+
+    def render():
+        selected = snapshot.select(selected_sport, selected_league, selected_status)
+        return dumps_json({
+            "version": snapshot.version,
+            "picks": scan_markets(snapshot, selected, min_odds, max_odds, groups, limit),
+        })
+
+    key = ("scanner", selected_sport, selected_league, selected_status, min_odds, max_odds,
+           tuple(sorted(groups)) if groups else None, limit, snapshot.version)
+    return serve_cached(key, render, mimetype="application/json")
+
+@app.route('/arbitrage')
+def arbitrage_list():
+    """Arbitrages détectés dans le flux (sport= et league= pour filtrer, limit)"""
+    selected_sport = request.args.get("sport", "").strip()
+    selected_league = request.args.get("league", "").strip()
+    limit = parse_per_page(request.args.get("limit", DEFAULT_PER_PAGE))
+    snapshot = get_snapshot()
+
+    def render():
+        found = [o for o in arbitrage_detector.opportunities()
+                 if (not selected_sport or o["sport"] == selected_sport)
+                 and (not selected_league or o["league"] == selected_league)]
+        return dumps_json({"version": snapshot.version, "count": len(found), "opportunities": found[:limit]})
+
+    return serve_cached(("arbitrage", selected_sport, selected_league, limit, snapshot.version), render,
+                        mimetype="application/json")
+
+# --- Mises à jour en direct (Server-Sent Events) ---
+
+STREAM_HISTORY = int(os.environ.get("STREAM_HISTORY", 256))
+STREAM_HEARTBEAT = float(os.environ.get("STREAM_HEARTBEAT", 15))
+STREAM_RETRY_MS = int(os.environ.get("STREAM_RETRY_MS", 3000))
+
+def status_key(match):
+    """Clé du filtre de statut ("live", "finished" ou "upcoming") d'un match"""
+    if match.is_live:
+        return "live"
+    if match.is_finished:
+        return "finished"
+    return "upcoming"
+
+def stream_update(delta, match, previous):
+    """Mise à jour compacte d'une ligne : (id, sport, ligue, statuts, JSON), ou None si rien de visible n'a changé.
+
+    `statuts` contient le statut avant et après, pour qu'un client filtré sur
+    « live » reçoive aussi le passage d'un de ses matchs à « Terminé ».
+    """
+    if delta.kind == "removed":
+        return (delta.id, previous.sport, previous.league, {status_key(previous)},
+                dumps_json({"id": delta.id, "kind": "removed"}))
+    if delta.kind == "changed" and delta.score is None and delta.minute is None and delta.status is None \
+            and not any(key[0] == 1 for key, _, _ in delta.odds):
+        return None
+    statuses = {status_key(match)}
+    if previous is not None:
+        statuses.add(status_key(previous))
+    return (delta.id, match.sport, match.league, statuses, stream_row(match, delta.kind))
+
+def stream_row(match, kind):
+    """Contenu JSON d'une ligne du tableau tel que l'applique home.js"""
+    return dumps_json({
+        "id": match.id,
+        "kind": kind,
+        "score": [match.score1, match.score2],
+        "minute": match.minute,
+        "status": match.status,
+        "odds": match.formatted_odds,
+        "prediction": match.prediction,
+        "probability": probability_text(one_x_two_book(match)),
+    })
+
+def stream_state(snapshot, sport="", league="", status=""):
+    """Toutes les lignes visibles avec ces filtres : l'état complet envoyé quand on ne peut pas rejouer les deltas"""
+    matches = snapshot.matches
+    rows = [stream_row(matches[pos], "changed") for pos in bitmap_positions(snapshot.select(sport, league, status))]
+    return b"[" + b",".join(rows) + b"]"
+
+class StreamEvent:
+    """Mises à jour d'une version du flux, déjà sérialisées une fois pour tous les clients"""
+    __slots__ = ("version", "base_version", "updates")
+
+    def __init__(self, version, base_version, updates):
+        self.version = version
+        self.base_version = base_version
+        self.updates = updates
+
+    def data(self, sport="", league="", status=""):
+        """Tableau JSON des mises à jour visibles avec ces filtres, ou None s'il n'y en a aucune"""
+        parts = [payload for _, match_sport, match_league, statuses, payload in self.updates
+                 if (not sport or match_sport == sport) and (not league or match_league == league)
+                 and (status not in ("live", "finished", "upcoming") or status in statuses)]
+        if not parts:
+            return None
+        return b"[" + b",".join(parts) + b"]"
+
+class UpdateHub:
+    """Diffuse les deltas de chaque snapshot aux connexions /stream.
+
+    Les derniers événements restent en mémoire (tampon circulaire) pour qu'un
+    client qui se reconnecte avec Last-Event-ID rattrape ce qu'il a manqué.
+
+    Les identifiants d'événement sont préfixés par une « époque » : en mode
+    partagé les versions viennent du processus d'ingestion et sont les mêmes
+    dans tous les workers (époque « shared ») ; sinon chaque worker numérote
+    ses propres snapshots et tire une époque au hasard, pour qu'un identifiant
+    venu d'un autre worker ne soit jamais pris pour une de ses versions.
+    """
+
+    def __init__(self, history=STREAM_HISTORY, shared=FEED_SHARED_SNAPSHOT):
+        self._cond = threading.Condition()
+        self._events = deque(maxlen=history)
+        self.version = 0
+        self.shared = shared
+        self.new_epoch()
+
+    def new_epoch(self):
+        self.epoch = "shared" if self.shared else os.urandom(4).hex()
+
+    def event_id(self, version):
+        return f"{self.epoch}-{version}"
+
+    def parse_id(self, value):
+        """Version désignée par un identifiant de ce hub ; None s'il est absent ou d'une autre époque"""
+        epoch, _, version = (value or "").rpartition("-")
+        if epoch != self.epoch or not version.isdigit():
+            return None
+        return int(version)
+
+    def publish(self, snapshot, previous):
+        """Abonné du SnapshotStore : prépare l'événement puis réveille les clients"""
+        updates = []
+        # Premier snapshot du processus : aucun client ne peut reprendre depuis la version 0
+        # (il recevra l'état complet), inutile de sérialiser une ligne par match
+        for delta in snapshot.changes if snapshot.changes and previous.version else ():
+            update = stream_update(delta, snapshot.by_id.get(delta.id), previous.by_id.get(delta.id))
+            if update is not None:
+                updates.append(update)
+        with self._cond:
+            self._events.append(StreamEvent(snapshot.version, snapshot.base_version, updates))
+            self.version = snapshot.version
+            self._cond.notify_all()
+
+    def since(self, version):
+        """Événements postérieurs à `version`, ou None si la chaîne n'est plus complète en mémoire"""
+        with self._cond:
+            if version == self.version:
+                return []
+            events = list(self._events)
+        for start, event in enumerate(events):
+            if event.base_version == version:
+                pending = events[start:]
+                break
+        else:
+            return None
+        for before, after in zip(pending, pending[1:]):
+            if after.base_version != before.version:
+                return None
+        return pending
+
+    def wait(self, version, timeout):
+        """Attend une version différente de `version` ; renvoie False à l'expiration du délai"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self.version != version, timeout)
+
+update_hub = UpdateHub()
+feed_store.subscribe(update_hub.publish)
+def _after_fork_in_child():
+    """Avec preload_app, les workers héritent du hub et du cache de pages du maître"""
+    update_hub.new_epoch()
+    if not update_hub.shared:
+        # Les pages déjà rendues portent l'époque du maître dans data-version
+        response_cache.clear()
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
+
+@app.route('/stream')
+def stream():
+    """Flux SSE des mises à jour de lignes (score, minute, statut, cotes 1X2).
+
+    Mêmes filtres que la page d'accueil. Un client qui se reconnecte envoie
+    Last-Event-ID (ou ?since= pour la première connexion depuis une page
+    rendue) et reçoit les versions manquées ; si elles ne sont plus en mémoire
+    ou que l'identifiant vient d'un autre worker, un événement « state » lui
+    envoie l'état courant de toutes les lignes visibles.
+    """
+    sport = request.args.get("sport", "").strip()
+    league = request.args.get("league", "").strip()
+    status = request.args.get("status", "").strip()
+    requested = request.headers.get("Last-Event-ID") or request.args.get("since")
+    since = update_hub.parse_id(requested)
+    get_snapshot()
+
+    def events():
+        version = since
+        if version is None and not requested:
+            version = update_hub.version
+        head = f"retry: {STREAM_RETRY_MS}\n"
+        if version is not None:
+            head += f"id: {update_hub.event_id(version)}\n"
+        yield (head + "\n").encode()
+        while True:
+            pending = update_hub.since(version) if version is not None else None
+            if pending is None:
+                snapshot = feed_store.current
+                version = snapshot.version
+                data = stream_state(snapshot, sport, league, status)
+                yield f"id: {update_hub.event_id(version)}\nevent: state\ndata: ".encode() + data + b"\n\n"
+            for event in pending or ():
+                data = event.data(sport, league, status)
+                version = event.version
+                if data is not None:
+                    yield f"id: {update_hub.event_id(version)}\nevent: update\ndata: ".encode() + data + b"\n\n"
+            if not update_hub.wait(version, STREAM_HEARTBEAT):
+                # Sans poller (fichier local, snapshot partagé) c'est ici qu'on relit le flux
+                get_snapshot()
+                if update_hub.version == version:
+                    yield f"id: {update_hub.event_id(version)}\n: ping\n\n".encode()
+
+    response = Response(events(), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+# --- Historique des cotes ---
+
+ODDS_HISTORY_POINTS = int(os.environ.get("ODDS_HISTORY_POINTS", 120))
+ODDS_HISTORY_MAX_EVENTS = int(os.environ.get("ODDS_HISTORY_MAX_EVENTS", 5000))
+
+class OddsSeries:
+    """Cotes successives d'un marché : deux array('d') circulaires (horodatage, cote).
+
+    Les tableaux grandissent jusqu'à `capacity` puis les nouveaux points
+    écrasent les plus anciens.
+    """
+    __slots__ = ("times", "values", "start", "capacity")
+
+    def __init__(self, capacity=ODDS_HISTORY_POINTS):
+        self.times = array.array("d")
+        self.values = array.array("d")
+        self.start = 0
+        self.capacity = capacity
+
+    def append(self, timestamp, value):
+        if len(self.values) < self.capacity:
+            self.times.append(timestamp)
+            self.values.append(value)
+        else:
+            self.times[self.start] = timestamp
+            self.values[self.start] = value
+            self.start = (self.start + 1) % self.capacity
+
+    def points(self):
+        """Points [horodatage, cote] du plus ancien au plus récent"""
+        order = itertools.chain(range(self.start, len(self.values)), range(self.start))
+        return [[self.times[i], self.values[i]] for i in order]
+
+class OddsHistory:
+    """Séries de cotes par (I, G, T, P), alimentées par les deltas des snapshots.
+
+    Une cote n'est enregistrée que lorsqu'elle change. Les matchs terminés ou
+    disparus du flux sont oubliés, et au-delà de `max_events` matchs suivis on
+    oublie ceux dont les cotes n'ont pas bougé depuis le plus longtemps.
+    """
+
+    def __init__(self, capacity=ODDS_HISTORY_POINTS, max_events=ODDS_HISTORY_MAX_EVENTS):
+        self.capacity = capacity
+        self.max_events = max_events
+        self._events = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, snapshot, previous):
+        """Abonné du SnapshotStore"""
+        timestamp = snapshot.loaded_at
+        with self._lock:
+            for delta in snapshot.changes or ():
+                match = snapshot.by_id.get(delta.id)
+                if match is None or match.is_finished:
+                    self._events.pop(delta.id, None)
+                    continue
+                if delta.kind == "added":
+                    changed = [((g, t, p), c) for g, t, p, c in match.iter_markets()]
+                else:
+                    changed = [(key, after) for key, _, after in delta.odds if after is not None]
+                if not changed:
+                    continue
+                series = self._events.get(delta.id)
+                if series is None:
+                    series = self._events[delta.id] = {}
+                else:
+                    self._events.move_to_end(delta.id)
+                for key, cote in changed:
+                    market = series.get(key)
+                    if market is None:
+                        market = series[key] = OddsSeries(self.capacity)
+                    market.append(timestamp, cote)
+            while len(self._events) > self.max_events:
+                self._events.popitem(last=False)
+
+    def series(self, match_id, group=None):
+        """{(G, T, P): points} pour un match, éventuellement limité au groupe G"""
+        with self._lock:
+            markets = self._events.get(match_id, {})
+            return {key: market.points() for key, market in markets.items()
+                    if group is None or key[0] == group}
+
+    def stats(self):
+        with self._lock:
+            return {
+                "events": len(self._events),
+                "series": sum(len(markets) for markets in self._events.values()),
+                "points": sum(len(m.values) for markets in self._events.values() for m in markets.values()),
+            }
+
+odds_history = OddsHistory()
+feed_store.subscribe(odds_history.record)
+
+@app.route('/api/match/<int:match_id>/odds-history')
+def api_odds_history(match_id):
+    """Évolution des cotes d'un match (?group=G pour un seul groupe de marchés, 1 = 1X2)"""
+    snapshot = get_snapshot()
+    match = snapshot.by_id.get(match_id)
+    try:
+        group = int(request.args["group"]) if request.args.get("group") else None
+    except ValueError:
+        return api_error("group doit être un entier", 400)
+    series = odds_history.series(match_id, group)
+    if match is None and not series:
+        return api_error(f"Aucun match trouvé pour l'identifiant {match_id}", 404)
+
+    def render():
+        markets = []
+        for (g, t, p), points in sorted(series.items(), key=lambda item: (item[0][0], item[0][1], item[0][2] or 0)):
+            label = traduire_pari_type_groupe(t, g, p, match.team1, match.team2) if match else f"G{g} T{t}"
+            markets.append({"market": [g, t, p], "label": label, "points": points})
+        return dumps_json({"id": match_id, "version": snapshot.version, "markets": markets})
+
+    return serve_cached(("api:odds-history", match_id, group, snapshot.version), render,
+                        mimetype="application/json")
+
 TEMPLATE = """<!DOCTYPE html>
 <html><head>
     <meta charset="utf-8">
@@ -1009,537 +2861,8 @@ TEMPLATE = """<!DOCTYPE html>
     <title>Live Football & Sports | Prédictions & Stats</title>
     <link rel="icon" type="image/png" href="https://cdn-icons-png.flaticon.com/512/197/197604.png">
     <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css" rel="stylesheet">
-    <style>
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        
-        body { 
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; 
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-            padding: 20px;
-        }
-        
-        .container {
-            max-width: 1400px;
-            margin: 0 auto;
-            background: rgba(255, 255, 255, 0.95);
-            border-radius: 20px;
-            box-shadow: 0 20px 40px rgba(0,0,0,0.1);
-            backdrop-filter: blur(10px);
-            padding: 30px;
-            animation: fadeInUp 0.8s ease-out;
-        }
-        
-        @keyframes fadeInUp {
-            from { opacity: 0; transform: translateY(30px); }
-            to { opacity: 1; transform: translateY(0); }
-        }
-        
-        h2 { 
-            text-align: center; 
-            font-size: 2.5em;
-            background: linear-gradient(45deg, #667eea, #764ba2);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            margin-bottom: 30px;
-            text-shadow: 2px 2px 4px rgba(0,0,0,0.1);
-        }
-        
-        .filters-container {
-            background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);
-            padding: 25px;
-            border-radius: 15px;
-            margin-bottom: 30px;
-            box-shadow: 0 10px 20px rgba(0,0,0,0.1);
-        }
-        
-        form { 
-            text-align: center; 
-            display: flex;
-            flex-wrap: wrap;
-            gap: 15px;
-            justify-content: center;
-            align-items: center;
-        }
-        
-        label { 
-            font-weight: bold; 
-            color: white;
-            font-size: 1.1em;
-            text-shadow: 1px 1px 2px rgba(0,0,0,0.3);
-        }
-        
-        select { 
-            padding: 12px 20px; 
-            font-size: 16px; 
-            border-radius: 25px; 
-            border: none; 
-            background: rgba(255,255,255,0.9); 
-            color: #333;
-            box-shadow: 0 5px 15px rgba(0,0,0,0.1);
-            transition: all 0.3s ease;
-            cursor: pointer;
-        }
-        
-        select:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 8px 25px rgba(0,0,0,0.15);
-        }
-        
-        select:focus { 
-            outline: none;
-            box-shadow: 0 0 0 3px rgba(255,255,255,0.5);
-        }
-        
-        .stats-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
-            gap: 20px;
-            margin-bottom: 30px;
-        }
-        
-        .stat-card {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 20px;
-            border-radius: 15px;
-            text-align: center;
-            box-shadow: 0 10px 20px rgba(0,0,0,0.1);
-            transition: transform 0.3s ease;
-        }
-        
-        .stat-card:hover {
-            transform: translateY(-5px);
-        }
-        
-        .stat-card i {
-            font-size: 2em;
-            margin-bottom: 10px;
-        }
-        
-        .table-container {
-            background: white;
-            border-radius: 15px;
-            overflow: hidden;
-            box-shadow: 0 15px 35px rgba(0,0,0,0.1);
-            margin-bottom: 30px;
-        }
-        
-        table { 
-            width: 100%;
-            border-collapse: collapse;
-            background: white;
-        }
-        
-        th, td { 
-            padding: 15px; 
-            text-align: center; 
-            font-size: 16px; 
-            border-bottom: 1px solid #eee;
-        }
-        
-        th { 
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            font-size: 18px;
-            font-weight: 600;
-            text-transform: uppercase;
-            letter-spacing: 1px;
-        }
-        
-        tr { transition: all 0.3s ease; }
-        
-        tr:hover {
-            background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);
-            color: white;
-            transform: scale(1.02);
-        }
-        
-        tr:nth-child(even) { background-color: #f8f9fa; }
-        
-        .status-badge {
-            padding: 8px 16px;
-            border-radius: 20px;
-            font-weight: bold;
-            font-size: 0.9em;
-            text-transform: uppercase;
-        }
-        
-        .status-live {
-            background: linear-gradient(45deg, #ff6b6b, #ee5a24);
-            color: white;
-            animation: pulse 2s infinite;
-        }
-        
-        .status-finished {
-            background: linear-gradient(45deg, #2ed573, #1e90ff);
-            color: white;
-        }
-        
-        .status-upcoming {
-            background: linear-gradient(45deg, #ffa726, #ff7043);
-            color: white;
-        }
-        
-        @keyframes pulse {
-            0% { box-shadow: 0 0 0 0 rgba(255, 107, 107, 0.7); }
-            70% { box-shadow: 0 0 0 10px rgba(255, 107, 107, 0); }
-            100% { box-shadow: 0 0 0 0 rgba(255, 107, 107, 0); }
-        }
-        
-        .pagination { 
-            text-align: center; 
-            margin: 30px 0; 
-        }
-        
-        .pagination button { 
-            padding: 15px 30px; 
-            margin: 0 10px; 
-            font-size: 16px; 
-            border: none; 
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white; 
-            border-radius: 25px; 
-            cursor: pointer; 
-            font-weight: bold; 
-            transition: all 0.3s ease;
-            box-shadow: 0 5px 15px rgba(0,0,0,0.1);
-        }
-        
-        .pagination button:hover {
-            transform: translateY(-3px);
-            box-shadow: 0 8px 25px rgba(0,0,0,0.2);
-        }
-        
-        .pagination button:disabled { 
-            background: #b2bec3; 
-            color: #636e72; 
-            cursor: not-allowed;
-            transform: none;
-            box-shadow: none;
-        }
-        
-        .details-btn {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            border: none;
-            padding: 10px 20px;
-            border-radius: 20px;
-            cursor: pointer;
-            transition: all 0.3s ease;
-            font-weight: bold;
-        }
-        
-        .details-btn:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 5px 15px rgba(0,0,0,0.2);
-        }
-        
-        .contact-box { 
-            background: linear-gradient(135deg, #ff6b6b 0%, #ee5a24 100%);
-            border: none;
-            border-radius: 20px; 
-            margin: 40px auto 0 auto; 
-            padding: 30px; 
-            text-align: center; 
-            font-size: 20px; 
-            font-weight: bold; 
-            color: white; 
-            max-width: 700px; 
-            box-shadow: 0 20px 40px rgba(255, 107, 107, 0.3);
-            animation: bounceIn 1s ease-out;
-        }
-        
-        @keyframes bounceIn {
-            0% { transform: scale(0.3); opacity: 0; }
-            50% { transform: scale(1.05); }
-            70% { transform: scale(0.9); }
-            100% { transform: scale(1); opacity: 1; }
-        }
-        
-        .contact-box a { 
-            color: white; 
-            font-weight: bold; 
-            text-decoration: none; 
-            font-size: 24px; 
-            transition: all 0.3s ease;
-        }
-        
-        .contact-box a:hover {
-            text-shadow: 0 0 10px rgba(255,255,255,0.8);
-            transform: scale(1.05);
-        }
-        
-        .contact-box .icon { 
-            font-size: 28px; 
-            vertical-align: middle; 
-            margin-right: 10px; 
-            animation: float 3s ease-in-out infinite;
-        }
-        
-        @keyframes float {
-            0%, 100% { transform: translateY(0px); }
-            50% { transform: translateY(-10px); }
-        }
-        
-        /* Loader amélioré */
-        #loader { 
-            display: none; 
-            position: fixed; 
-            left: 0; 
-            top: 0; 
-            width: 100vw; 
-            height: 100vh; 
-            background: rgba(0,0,0,0.8); 
-            z-index: 9999; 
-            justify-content: center; 
-            align-items: center; 
-            backdrop-filter: blur(5px);
-        }
-        
-        #loader .spinner { 
-            width: 80px;
-            height: 80px;
-            border: 8px solid rgba(255,255,255,0.3);
-            border-top: 8px solid #667eea;
-            border-radius: 50%;
-            animation: spin 1s linear infinite;
-            box-shadow: 0 0 30px rgba(102, 126, 234, 0.5);
-        }
-        
-        @keyframes spin { 
-            100% { transform: rotate(360deg); } 
-        }
-        
-        /* Responsive amélioré pour mobile et PC */
-        @media (max-width: 768px) {
-            .container { 
-                padding: 15px; 
-                margin: 5px; 
-                border-radius: 15px;
-            }
-            
-            h2 { 
-                font-size: 1.8em; 
-                margin-bottom: 20px;
-            }
-            
-            .filters-container {
-                padding: 20px;
-                margin-bottom: 20px;
-            }
-            
-            form { 
-                flex-direction: column; 
-                gap: 10px;
-            }
-            
-            select {
-                width: 100%;
-                margin: 5px 0;
-            }
-            
-            .stats-grid { 
-                grid-template-columns: 1fr; 
-                gap: 15px;
-                margin-bottom: 20px;
-            }
-            
-            .stat-card {
-                padding: 15px;
-            }
-            
-            .table-container { 
-                overflow-x: auto; 
-                margin-bottom: 20px;
-                border-radius: 15px;
-            }
-            
-            /* Transformation du tableau pour mobile */
-            table { 
-                min-width: 100%;
-                border-collapse: collapse;
-            }
-            
-            thead { display: none; }
-            
-            tbody { display: block; }
-            
-            tr { 
-                display: block;
-                margin-bottom: 15px; 
-                background: white; 
-                border-radius: 15px; 
-                box-shadow: 0 5px 15px rgba(0,0,0,0.1);
-                padding: 15px;
-                border: 1px solid #eee;
-            }
-            
-            td { 
-                display: block;
-                border: none; 
-                border-bottom: 1px solid #f0f0f0; 
-                position: relative; 
-                padding: 12px 15px 12px 120px; 
-                min-height: 50px; 
-                font-size: 14px; 
-                text-align: left;
-            }
-            
-            td:last-child {
-                border-bottom: none;
-                padding: 15px;
-                text-align: center;
-            }
-            
-            td:before { 
-                position: absolute; 
-                top: 50%;
-                left: 15px; 
-                width: 100px; 
-                white-space: nowrap; 
-                font-weight: bold; 
-                color: #667eea;
-                transform: translateY(-50%);
-                font-size: 12px;
-            }
-            
-            td:nth-of-type(1):before { content: '🏆 Équipe 1'; }
-            td:nth-of-type(2):before { content: '⚽ Score 1'; }
-            td:nth-of-type(3):before { content: '⚽ Score 2'; }
-            td:nth-of-type(4):before { content: '🏆 Équipe 2'; }
-            td:nth-of-type(5):before { content: '🎯 Sport'; }
-            td:nth-of-type(6):before { content: '🏅 Ligue'; }
-            td:nth-of-type(7):before { content: '📊 Statut'; }
-            td:nth-of-type(8):before { content: '🕐 Date & Heure'; }
-            td:nth-of-type(9):before { content: '🌡️ Température'; }
-            td:nth-of-type(10):before { content: '💧 Humidité'; }
-            td:nth-of-type(11):before { content: '💰 Cotes'; }
-            td:nth-of-type(12):before { content: '🔮 Prédiction'; }
-            td:nth-of-type(13):before { content: '📋 Détails'; }
-            
-            .details-btn {
-                width: 100%;
-                padding: 15px;
-                font-size: 16px;
-                margin: 10px 0;
-            }
-            
-            .pagination {
-                margin: 20px 0;
-            }
-            
-            .pagination button {
-                padding: 12px 20px;
-                font-size: 14px;
-                margin: 5px;
-            }
-            
-            .contact-box {
-                padding: 20px;
-                font-size: 16px;
-                margin: 20px auto;
-            }
-            
-            .contact-box a {
-                font-size: 18px;
-            }
-        }
-        
-        /* Optimisations pour tablettes */
-        @media (min-width: 769px) and (max-width: 1024px) {
-            .container {
-                max-width: 95%;
-                padding: 25px;
-            }
-            
-            .table-container {
-                overflow-x: auto;
-            }
-            
-            table {
-                min-width: 800px;
-            }
-            
-            .details-btn {
-                padding: 8px 15px;
-                font-size: 14px;
-            }
-        }
-        
-        /* Optimisations pour PC */
-        @media (min-width: 1025px) {
-            .container {
-                max-width: 1400px;
-            }
-            
-            .table-container {
-                overflow: visible;
-            }
-            
-            .details-btn {
-                padding: 10px 20px;
-                font-size: 16px;
-                white-space: nowrap;
-            }
-            
-            /* Assurer que le bouton détails est toujours visible */
-            td:last-child {
-                min-width: 120px;
-                text-align: center;
-            }
-        }
-        
-        /* Effets de scroll */
-        .scroll-reveal {
-            opacity: 0;
-            transform: translateY(30px);
-            transition: all 0.6s ease;
-        }
-        
-        .scroll-reveal.revealed {
-            opacity: 1;
-            transform: translateY(0);
-        }
-    </style>
-    <script>
-        document.addEventListener('DOMContentLoaded', function() {
-            // Animation au scroll
-            const observerOptions = {
-                threshold: 0.1,
-                rootMargin: '0px 0px -50px 0px'
-            };
-            
-            const observer = new IntersectionObserver(function(entries) {
-                entries.forEach(entry => {
-                    if (entry.isIntersecting) {
-                        entry.target.classList.add('revealed');
-                    }
-                });
-            }, observerOptions);
-            
-            document.querySelectorAll('.scroll-reveal').forEach(el => {
-                observer.observe(el);
-            });
-            
-            // Loader
-            var forms = document.querySelectorAll('form');
-            forms.forEach(function(form) {
-                form.addEventListener('submit', function() {
-                    document.getElementById('loader').style.display = 'flex';
-                });
-            });
-            
-            // Effet de parallaxe sur le titre
-            window.addEventListener('scroll', function() {
-                const scrolled = window.pageYOffset;
-                const title = document.querySelector('h2');
-                if (title) {
-                    title.style.transform = `translateY(${scrolled * 0.5}px)`;
-                }
-            });
-        });
-    </script>
+    <link href="{{ asset_url('css/home.css') }}" rel="stylesheet">
+    <script src="{{ asset_url('js/home.js') }}"></script>
 </head><body>
     <div id="loader" role="status" aria-live="polite">
         <div class="spinner" aria-label="Chargement"></div>
@@ -1548,6 +2871,12 @@ TEMPLATE = """<!DOCTYPE html>
     <div class="container">
         <h2 class="scroll-reveal">⚽ Live Football & Sports | Prédictions & Stats 📊</h2>
 
+        {% if stale_minutes is not none %}
+        <div class="stale-banner" role="status">
+            <i class="fas fa-exclamation-triangle"></i> Flux en ligne indisponible : données de secours mises à jour il y a {{ stale_minutes }} min
+        </div>
+        {% endif %}
+
         <div class="filters-container scroll-reveal">
             <form method="get" aria-label="Filtres de matchs">
                 <label for="sport-select"><i class="fas fa-futbol"></i> Sport :</label>
@@ -1589,7 +2918,7 @@ TEMPLATE = """<!DOCTYPE html>
             </div>
             <div class="stat-card">
                 <i class="fas fa-chart-line"></i>
-                <h3>{{ data|length }} matchs</h3>
+                <h3>{{ rows_count }} matchs</h3>
                 <p>Résultats trouvés</p>
             </div>
         </div>
@@ -1599,6 +2928,7 @@ TEMPLATE = """<!DOCTYPE html>
                 <input type="hidden" name="sport" value="{{ selected_sport if selected_sport != 'Tous' else '' }}">
                 <input type="hidden" name="league" value="{{ selected_league if selected_league != 'Toutes' else '' }}">
                 <input type="hidden" name="status" value="{{ selected_status if selected_status != 'Tous' else '' }}">
+                {% if per_page != 20 %}<input type="hidden" name="per_page" value="{{ per_page }}">{% endif %}
                 <button type="submit" name="page" value="{{ page-1 }}" {% if page <= 1 %}disabled{% endif %} aria-label="Page précédente">
                     <i class="fas fa-chevron-left"></i> Précédente
                 </button>
@@ -1608,6 +2938,8 @@ TEMPLATE = """<!DOCTYPE html>
                 <input type="hidden" name="sport" value="{{ selected_sport if selected_sport != 'Tous' else '' }}">
                 <input type="hidden" name="league" value="{{ selected_league if selected_league != 'Toutes' else '' }}">
                 <input type="hidden" name="status" value="{{ selected_status if selected_status != 'Tous' else '' }}">
+                {% if per_page != 20 %}<input type="hidden" name="per_page" value="{{ per_page }}">{% endif %}
+                {% if next_cursor %}<input type="hidden" name="after" value="{{ next_cursor }}">{% endif %}
                 <button type="submit" name="page" value="{{ page+1 }}" {% if page >= total_pages %}disabled{% endif %} aria-label="Page suivante">
                     Suivante <i class="fas fa-chevron-right"></i>
                 </button>
@@ -1615,7 +2947,7 @@ TEMPLATE = """<!DOCTYPE html>
         </div>
 
         <div class="table-container scroll-reveal">
-            <table>
+            <table id="matches-table" data-version="{{ version }}">
                 <tr>
                     <th><i class="fas fa-users"></i> Équipe 1</th>
                     <th><i class="fas fa-futbol"></i> Score 1</th>
@@ -1631,24 +2963,37 @@ TEMPLATE = """<!DOCTYPE html>
                     <th><i class="fas fa-magic"></i> Prédiction</th>
                     <th><i class="fas fa-info-circle"></i> Détails</th>
                 </tr>
-                {% for m in data %}
-                <tr class="scroll-reveal">
+                {{ rows }}
+            </table>
+        </div>
+        
+        <div class="contact-box scroll-reveal">
+            <span class="icon">📬</span> Inbox Telegram : <a href="https://t.me/Roidesombres225" target="_blank">@Roidesombres225</a><br>
+            <span class="icon">📢</span> Canal Telegram : <a href="https://t.me/SOLITAIREHACK" target="_blank">SOLITAIREHACK</a><br>
+            <span class="icon">🎨</span> Je suis aussi concepteur graphique et créateur de logiciels.<br>
+            <span style="color:#fff; font-size:22px; font-weight:bold; text-shadow: 0 2px 4px rgba(0,0,0,0.3);">Vous avez un projet en tête ? Contactez-moi, je suis là pour vous !</span>
+        </div>
+    </div>
+</body></html>"""
+
+# Ligne du tableau d'accueil, rendue une fois par version de match (voir FragmentCache)
+ROW_TEMPLATE = """                <tr class="scroll-reveal"{% if m.id %} data-id="{{m.id}}"{% endif %}>
                     <td><strong>{{m.team1}}</strong></td>
-                    <td><span class="score">{{m.score1}}</span></td>
-                    <td><span class="score">{{m.score2}}</span></td>
+                    <td><span class="score" data-field="score1">{{m.score1}}</span></td>
+                    <td><span class="score" data-field="score2">{{m.score2}}</span></td>
                     <td><strong>{{m.team2}}</strong></td>
                     <td><i class="fas fa-{{ 'futbol' if m.sport == 'Football' else 'basketball-ball' if m.sport == 'Basketball' else 'table-tennis' if m.sport == 'Tennis' else 'hockey-puck' if m.sport == 'Hockey' else 'cricket' if m.sport == 'Cricket' else 'trophy' }}"></i> {{m.sport}}</td>
                     <td>{{m.league}}</td>
                     <td>
-                        <span class="status-badge {% if 'En cours' in m.status %}status-live{% elif 'Terminé' in m.status %}status-finished{% else %}status-upcoming{% endif %}">
+                        <span class="status-badge {% if 'En cours' in m.status %}status-live{% elif 'Terminé' in m.status %}status-finished{% else %}status-upcoming{% endif %}" data-field="status">
                             {{m.status}}
                         </span>
                     </td>
                     <td><i class="fas fa-calendar-alt"></i> {{m.datetime}}</td>
                     <td><i class="fas fa-thermometer-half"></i> {{m.temp}}°C</td>
                     <td><i class="fas fa-tint"></i> {{m.humid}}%</td>
-                    <td><i class="fas fa-coins"></i> {{m.odds|join(" | ")}}</td>
-                    <td><i class="fas fa-magic"></i> {{m.prediction}}</td>
+                    <td><i class="fas fa-coins"></i> <span data-field="odds">{{m.odds|join(" | ")}}</span></td>
+                    <td><i class="fas fa-magic"></i> <span data-field="prediction">{{m.prediction}}</span>{% if m.probability %}<br><small data-field="probability">{{m.probability}}</small>{% endif %}</td>
                     <td>
                         {% if m.id %}
                             <a href="/match/{{m.id}}">
@@ -1661,18 +3006,60 @@ TEMPLATE = """<!DOCTYPE html>
                         {% endif %}
                     </td>
                 </tr>
-                {% endfor %}
-            </table>
-        </div>
-        
-        <div class="contact-box scroll-reveal">
-            <span class="icon">📬</span> Inbox Telegram : <a href="https://t.me/Roidesombres225" target="_blank">@Roidesombres225</a><br>
-            <span class="icon">📢</span> Canal Telegram : <a href="https://t.me/SOLITAIREHACK" target="_blank">SOLITAIREHACK</a><br>
-            <span class="icon">🎨</span> Je suis aussi concepteur graphique et créateur de logiciels.<br>
-            <span style="color:#fff; font-size:22px; font-weight:bold; text-shadow: 0 2px 4px rgba(0,0,0,0.3);">Vous avez un projet en tête ? Contactez-moi, je suis là pour vous !</span>
-        </div>
-    </div>
-</body></html>"""
+"""
+
+_compiled_templates = {}
+
+def compiled_template(name):
+    """Gabarit Jinja compilé une seule fois par processus"""
+    template = _compiled_templates.get(name)
+    if template is None:
+        source = {"home": TEMPLATE, "row": ROW_TEMPLATE}[name]
+        template = _compiled_templates[name] = app.jinja_env.from_string(source)
+    return template
+
+class FragmentCache:
+    """Fragments HTML par match, réutilisés tant que la clé de rendu du match ne change pas."""
+
+    def __init__(self):
+        self._entries = {}
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+
+    def sync(self, snapshot):
+        """Oublie les matchs disparus quand un nouveau snapshot arrive.
+
+        Un match modifié garde son entrée : render() la compare à sa clé de rendu.
+        Si le snapshot suit directement celui qu'on connaît, ses deltas suffisent ;
+        sinon (versions sautées) on repasse sur tout le cache.
+        """
+        if snapshot.version == self._version:
+            return
+        if snapshot.changes is not None and snapshot.base_version == self._version:
+            for delta in snapshot.changes:
+                if delta.kind == "removed":
+                    self._entries.pop(delta.id, None)
+        else:
+            for match_id in list(self._entries):
+                if match_id not in snapshot.by_id:
+                    self._entries.pop(match_id, None)
+        self._version = snapshot.version
+
+    def render(self, match, analytics=None):
+        key = match.render_key
+        cached = self._entries.get(match.id)
+        if cached is not None and cached[0] == key:
+            self.hits += 1
+            return cached[1]
+        self.misses += 1
+        book = analytics.one_x_two(match.id) if analytics is not None else None
+        html = compiled_template("row").render(m=match_row(match, book))
+        if match.id is not None:
+            self._entries[match.id] = (key, html)
+        return html
+
+row_cache = FragmentCache()
 
 def calculate_percentage(s1, s2):
     """Calcule le pourcentage pour la barre de progression"""
@@ -1707,6 +3094,87 @@ def generer_prediction_lisible(nom, valeur, team1, team2):
         return f"{nom} ({team2})"
     return nom
 
+STARTUP_BUDGET_MS = float(os.environ.get("STARTUP_BUDGET_MS", 2000))
+
+class StartupTimer:
+    """Mesure et journalise la durée de chaque phase du démarrage"""
+
+    def __init__(self, started=None):
+        self.started = started if started is not None else time.perf_counter()
+        self.phases = []
+        self._mark = self.started
+
+    def phase(self, name):
+        now = time.perf_counter()
+        self.phases.append((name, (now - self._mark) * 1000))
+        self._mark = now
+
+    @property
+    def total_ms(self):
+        return (self._mark - self.started) * 1000
+
+    def report(self, budget_ms=STARTUP_BUDGET_MS):
+        details = ", ".join(f"{name} {ms:.0f} ms" for name, ms in self.phases)
+        print(f"Démarrage en {self.total_ms:.0f} ms ({details})")
+        if self.total_ms > budget_ms:
+            print(f"ATTENTION : démarrage au-delà du budget de {budget_ms:.0f} ms")
+
+startup_timer = StartupTimer(_import_started)
+startup_timer.phase("imports")
+
+def create_app():
+    """Prépare l'application avant de servir : snapshot, index, gabarits et première page.
+
+    Avec gunicorn (preload_app = True, voir gunicorn.conf.py) tout ce travail est
+    fait une seule fois dans le maître avant le fork des workers.
+    """
+    snapshot = get_snapshot()
+    startup_timer.phase(f"snapshot ({len(snapshot.matches)} matchs, source {snapshot.source})")
+    compiled_template("home")
+    compiled_template("row")
+    for filename in ("css/home.css", "js/home.js", "css/match.css", "js/match.js"):
+        asset_url(filename)
+    startup_timer.phase("gabarits")
+    warm_home_page()
+    startup_timer.phase("préchauffage")
+    startup_timer.report()
+    return app
+
+def warm_home_page():
+    """Met en cache la page d'accueil par défaut pour la première visite.
+
+    Sous gunicorn, le hook post_fork la refait dans chaque worker : celle du
+    maître porte l'époque de son UpdateHub, inconnue des workers.
+    """
+    snapshot = get_snapshot()
+    age = stale_minutes(snapshot)
+    key = ("home", "", "", "", 1, DEFAULT_PER_PAGE, None, snapshot.version, age)
+    response_cache.put(key, CachedPage(render_home(snapshot, "", "", "", 1, DEFAULT_PER_PAGE, None, age)))
+
+def run_ingestion():
+    """Processus d'ingestion unique pour le mode partagé.
+
+    Récupère et parse le flux (fichier local ou API), puis publie chaque
+    nouvelle version dans FEED_BINARY_FILE ; les workers gunicorn lancés avec
+    FEED_SHARED_SNAPSHOT=1 s'y attachent sans rien parser eux-mêmes.
+    """
+    previous = load_binary_snapshot(feed_store.binary_path)
+    if previous is not None:
+        # Les versions restent croissantes d'un redémarrage à l'autre : les caches des workers en dépendent
+        feed_store.resume_version(previous.version)
+    print(f"Ingestion : publication du snapshot partagé dans {feed_store.binary_path}")
+    while True:
+        try:
+            feed_store.refresh_from_file(JSON_FILE)
+        except FileNotFoundError:
+            feed_poller.start()
+        except Exception as e:
+            print(f"Erreur lors du chargement du fichier JSON: {e}")
+        time.sleep(FEED_POLL_INTERVAL if feed_poller.running else FEED_SHARED_CHECK)
+
 if __name__ == "__main__":
-    port = int(os.environ.get("PORT", 5000))
-    app.run(host="0.0.0.0", port=port)
+    if sys.argv[1:2] == ["ingest"]:
+        run_ingestion()
+    else:
+        port = int(os.environ.get("PORT", 5000))
+        create_app().run(host="0.0.0.0", port=port)
@@ -0,0 +1,42 @@
+# Configuration gunicorn : gunicorn -c gunicorn.conf.py
+#
+# L'application est chargée une seule fois dans le maître (preload_app) :
+# snapshot, index et gabarits sont prêts avant le fork, et les workers
+# démarrent avec eux déjà en mémoire (copy-on-write). La page d'accueil,
+# qui porte l'époque /stream du worker, est refaite dans post_fork.
+#
+# En mode FEED_SHARED_SNAPSHOT=1, seuls les marchés du snapshot binaire sont
+# partagés entre workers : chacun garde ses matchs décodés, ses index et son
+# historique des cotes (voir SharedSnapshotReader pour les ordres de grandeur).
+#
+# Workers gevent par défaut : une connexion /stream inactive ne coûte qu'une
+# greenlet, pas un thread ni un worker synchrone. Le monkey-patching doit
+# précéder le préchargement de l'application (verrous, sockets, threads).
+import os
+
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gevent")
+if worker_class == "gevent":
+    from gevent import monkey
+    monkey.patch_all()
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+threads = int(os.environ.get("GUNICORN_THREADS", 4))  # workers gthread uniquement
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", 2000))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+wsgi_app = "app:create_app()"
+preload_app = True
+
+
+def when_ready(server):
+    # Le poller démarré pendant le préchargement ne doit pas tourner dans le maître :
+    # chaque worker le relance à sa première requête (ou lit le snapshot partagé).
+    from app import feed_poller
+    feed_poller.stop(timeout=5)
+
+
+def post_fork(server, worker):
+    # La page d'accueil du maître a été vidée du cache au fork (époque /stream propre
+    # à chaque worker) : on la refait ici plutôt qu'à la première visite.
+    from app import warm_home_page
+    warm_home_page()
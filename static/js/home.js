@@ -0,0 +1,102 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Animation au scroll
+    const observerOptions = {
+        threshold: 0.1,
+        rootMargin: '0px 0px -50px 0px'
+    };
+
+    const observer = new IntersectionObserver(function(entries) {
+        entries.forEach(entry => {
+            if (entry.isIntersecting) {
+                entry.target.classList.add('revealed');
+            }
+        });
+    }, observerOptions);
+
+    document.querySelectorAll('.scroll-reveal').forEach(el => {
+        observer.observe(el);
+    });
+
+    // Loader
+    var forms = document.querySelectorAll('form');
+    forms.forEach(function(form) {
+        form.addEventListener('submit', function() {
+            document.getElementById('loader').style.display = 'flex';
+        });
+    });
+
+    // Mises à jour en direct des lignes affichées (SSE)
+    var table = document.getElementById('matches-table');
+    if (table && window.EventSource) {
+        var params = new URLSearchParams(window.location.search);
+        var query = new URLSearchParams();
+        ['sport', 'league', 'status'].forEach(function(name) {
+            if (params.get(name)) {
+                query.set(name, params.get(name));
+            }
+        });
+        query.set('since', table.dataset.version);
+        var source = new EventSource('/stream?' + query.toString());
+
+        var setField = function(row, field, value) {
+            var el = row.querySelector('[data-field="' + field + '"]');
+            if (el && el.textContent.trim() !== String(value)) {
+                el.textContent = value;
+            }
+            return el;
+        };
+
+        var applyUpdate = function(update) {
+            var row = table.querySelector('tr[data-id="' + update.id + '"]');
+            if (!row) {
+                return;
+            }
+            if (update.kind === 'removed') {
+                row.classList.add('row-removed');
+                return;
+            }
+            row.classList.remove('row-removed');
+            setField(row, 'score1', update.score[0]);
+            setField(row, 'score2', update.score[1]);
+            setField(row, 'odds', update.odds.join(' | '));
+            setField(row, 'prediction', update.prediction);
+            if (update.probability) {
+                setField(row, 'probability', update.probability);
+            }
+            var badge = setField(row, 'status', update.status);
+            if (badge) {
+                badge.classList.remove('status-live', 'status-finished', 'status-upcoming');
+                badge.classList.add(update.status.indexOf('En cours') !== -1 ? 'status-live'
+                    : update.status.indexOf('Terminé') !== -1 ? 'status-finished' : 'status-upcoming');
+            }
+        };
+
+        source.addEventListener('update', function(event) {
+            JSON.parse(event.data).forEach(applyUpdate);
+        });
+
+        // Versions manquées introuvables (autre worker, trop anciennes) : le serveur envoie
+        // l'état courant de toutes les lignes visibles ; celles qui n'y sont plus ont disparu du flux
+        source.addEventListener('state', function(event) {
+            var seen = {};
+            JSON.parse(event.data).forEach(function(update) {
+                seen[update.id] = true;
+                applyUpdate(update);
+            });
+            table.querySelectorAll('tr[data-id]').forEach(function(row) {
+                if (!seen[row.dataset.id]) {
+                    row.classList.add('row-removed');
+                }
+            });
+        });
+    }
+
+    // Effet de parallaxe sur le titre
+    window.addEventListener('scroll', function() {
+        const scrolled = window.pageYOffset;
+        const title = document.querySelector('h2');
+        if (title) {
+            title.style.transform = `translateY(${scrolled * 0.5}px)`;
+        }
+    });
+});
@@ -0,0 +1,209 @@
+// Données du match injectées par la page (voir render_match_details)
+const matchData = JSON.parse(document.getElementById('match-data').textContent);
+const labels = matchData.labels;
+const data1 = matchData.data1;
+const data2 = matchData.data2;
+
+// Graphique des statistiques principales
+
+new Chart(document.getElementById('statsChart'), {
+    type: 'bar',
+    data: {
+        labels: labels,
+        datasets: [
+            {
+                label: matchData.team1,
+                data: data1,
+                backgroundColor: 'rgba(102, 126, 234, 0.8)',
+                borderColor: 'rgba(102, 126, 234, 1)',
+                borderWidth: 2,
+                borderRadius: 8,
+                borderSkipped: false,
+            },
+            {
+                label: matchData.team2,
+                data: data2,
+                backgroundColor: 'rgba(118, 75, 162, 0.8)',
+                borderColor: 'rgba(118, 75, 162, 1)',
+                borderWidth: 2,
+                borderRadius: 8,
+                borderSkipped: false,
+            }
+        ]
+    },
+    options: {
+        responsive: true,
+        maintainAspectRatio: false,
+        plugins: {
+            legend: {
+                position: 'top',
+                labels: {
+                    font: {
+                        size: 14,
+                        weight: 'bold'
+                    },
+                    padding: 20
+                }
+            },
+            title: {
+                display: true,
+                text: 'Comparaison des Statistiques',
+                font: {
+                    size: 18,
+                    weight: 'bold'
+                }
+            }
+        },
+        scales: {
+            y: {
+                beginAtZero: true,
+                grid: {
+                    color: 'rgba(0,0,0,0.1)'
+                }
+            },
+            x: {
+                grid: {
+                    display: false
+                }
+            }
+        },
+        animation: {
+            duration: 2000,
+            easing: 'easeInOutQuart'
+        }
+    }
+});
+
+// Graphique de performance (donut chart)
+const total1 = data1.reduce((a, b) => a + b, 0);
+const total2 = data2.reduce((a, b) => a + b, 0);
+
+new Chart(document.getElementById('performanceChart'), {
+    type: 'doughnut',
+    data: {
+        labels: [matchData.team1, matchData.team2],
+        datasets: [{
+            data: [total1, total2],
+            backgroundColor: [
+                'rgba(102, 126, 234, 0.8)',
+                'rgba(118, 75, 162, 0.8)'
+            ],
+            borderColor: [
+                'rgba(102, 126, 234, 1)',
+                'rgba(118, 75, 162, 1)'
+            ],
+            borderWidth: 3,
+            hoverOffset: 4
+        }]
+    },
+    options: {
+        responsive: true,
+        maintainAspectRatio: false,
+        plugins: {
+            legend: {
+                position: 'bottom',
+                labels: {
+                    font: {
+                        size: 14,
+                        weight: 'bold'
+                    },
+                    padding: 20
+                }
+            },
+            title: {
+                display: true,
+                text: 'Répartition des Performances',
+                font: {
+                    size: 18,
+                    weight: 'bold'
+                }
+            }
+        },
+        animation: {
+            duration: 2000,
+            easing: 'easeInOutQuart'
+        }
+    }
+});
+
+// Évolution des cotes 1X2 (historique gardé en mémoire par le serveur)
+const oddsColors = ['rgba(102, 126, 234, 1)', 'rgba(118, 75, 162, 1)', 'rgba(255, 167, 38, 1)'];
+
+fetch('/api/match/' + matchData.id + '/odds-history?group=1')
+    .then(response => response.ok ? response.json() : { markets: [] })
+    .then(history => {
+        const now = Date.now();
+        new Chart(document.getElementById('oddsChart'), {
+            type: 'line',
+            data: {
+                datasets: history.markets.map((market, i) => {
+                    const points = market.points.map(p => ({ x: p[0] * 1000, y: p[1] }));
+                    // La dernière cote reste valable jusqu'à maintenant
+                    if (points.length) {
+                        points.push({ x: now, y: points[points.length - 1].y });
+                    }
+                    return {
+                        label: market.label,
+                        data: points,
+                        stepped: true,
+                        borderColor: oddsColors[i % oddsColors.length],
+                        backgroundColor: oddsColors[i % oddsColors.length],
+                        borderWidth: 2,
+                        pointRadius: 2
+                    };
+                })
+            },
+            options: {
+                responsive: true,
+                maintainAspectRatio: false,
+                plugins: {
+                    legend: {
+                        position: 'top'
+                    },
+                    title: {
+                        display: true,
+                        text: history.markets.length ? 'Évolution des Cotes' : 'Pas encore d\'historique de cotes',
+                        font: {
+                            size: 18,
+                            weight: 'bold'
+                        }
+                    }
+                },
+                scales: {
+                    x: {
+                        type: 'time',
+                        time: {
+                            tooltipFormat: 'HH:mm:ss'
+                        }
+                    },
+                    y: {
+                        grid: {
+                            color: 'rgba(0,0,0,0.1)'
+                        }
+                    }
+                }
+            }
+        });
+    });
+
+// Animation au scroll
+const observerOptions = {
+    threshold: 0.1,
+    rootMargin: '0px 0px -50px 0px'
+};
+
+const observer = new IntersectionObserver(function(entries) {
+    entries.forEach(entry => {
+        if (entry.isIntersecting) {
+            entry.target.style.opacity = '1';
+            entry.target.style.transform = 'translateY(0)';
+        }
+    });
+}, observerOptions);
+
+document.querySelectorAll('.chart-container').forEach(el => {
+    el.style.opacity = '0';
+    el.style.transform = 'translateY(30px)';
+    el.style.transition = 'all 0.6s ease';
+    observer.observe(el);
+});
@@ -0,0 +1,852 @@
+import gzip
+import http.server
+import io
+import json
+import math
+import random
+import threading
+import time
+
+import pytest
+
+import app
+
+
+def feed_event(event_id, home=1.8, draw=3.4, away=4.2, score=(0, 0), minute=0, finished=False, extra=()):
+    """Entrée brute minimale au format 1xbet"""
+    return {
+        "I": event_id, "LE": "England. Premier League", "O1": f"Team{event_id}A", "O2": f"Team{event_id}B",
+        "S": 1700000000,
+        "SC": {"FS": {"S1": score[0], "S2": score[1]}, "TS": minute * 60, "TT": 3 if finished else 1},
+        "E": [{"G": 1, "T": 1, "C": home}, {"G": 1, "T": 3, "C": draw}, {"G": 1, "T": 2, "C": away}] + list(extra),
+    }
+
+
+class StubFeed:
+    """Serveur HTTP local qui sert un flux JSON, avec ETag et réponses 304"""
+
+    def __init__(self):
+        self.events = []
+        self.etag = '"v1"'
+        self.requests = []
+        self.fail = False
+        stub = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.requests.append((self.path, dict(self.headers)))
+                if stub.should_fail(self.path):
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                if self.headers.get("If-None-Match") == stub.etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                body = json.dumps({"Success": True, "Value": stub.events_for(self.path)}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", stub.etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/feed"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def events_for(self, path):
+        return self.events
+
+    def should_fail(self, path):
+        return self.fail
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = StubFeed()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def session():
+    http_session = app.make_http_session()
+    yield http_session
+    http_session.close()
+
+
+# --- user-002 : poller et requêtes conditionnelles ---
+
+def test_load_from_api_keeps_validators_and_handles_304(stub, session):
+    stub.events = [feed_event(1)]
+    validators = {}
+    assert app.load_from_api(session, stub.url, validators) == stub.events
+    assert validators["etag"] == '"v1"'
+    assert app.load_from_api(session, stub.url, validators) is None
+    assert stub.requests[-1][1].get("If-None-Match") == '"v1"'
+
+
+def test_poll_once_publishes_then_skips_unchanged_feed(stub, session, tmp_path):
+    stub.events = [feed_event(1), feed_event(2)]
+    store = app.SnapshotStore(binary_path=None)
+    poller = app.FeedPoller(store, stub.url, session=session, last_good_path=str(tmp_path / "last_good.json"))
+    snapshot = poller.poll_once()
+    assert snapshot.source == "api"
+    assert sorted(snapshot.by_id) == [1, 2]
+    assert poller.poll_once() is None
+    assert store.version == snapshot.version
+
+
+# --- user-003 : single-flight, disjoncteur et dernier flux valide ---
+
+def test_single_flight_shares_one_call():
+    flight = app.SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "ok"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do(slow))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    started.wait(5)
+    time.sleep(0.2)  # laisse les autres threads rejoindre l'appel en cours
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert results == ["ok"] * 5
+    assert len(calls) == 1
+
+
+def test_circuit_breaker_opens_then_half_opens(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(app.time, "time", lambda: now[0])
+    breaker = app.CircuitBreaker(threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+    now[0] += 30
+    assert breaker.state == "half-open" and breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_last_good_round_trip_leaves_no_temp_file(tmp_path):
+    path = tmp_path / "last_good.json"
+    app.save_last_good([feed_event(7)], 123.0, str(path))
+    assert [p.name for p in tmp_path.iterdir()] == ["last_good.json"]
+    store = app.SnapshotStore(binary_path=None)
+    snapshot = app.load_last_good(store, str(path))
+    assert snapshot.source == "last-good" and snapshot.loaded_at == 123.0
+    assert list(snapshot.by_id) == [7]
+
+
+def test_corrupt_last_good_does_not_block_the_poller(tmp_path):
+    path = tmp_path / "last_good.json"
+    app.save_last_good([feed_event(7)], 123.0, str(path))
+    path.write_bytes(path.read_bytes()[:40])
+    store = app.SnapshotStore(binary_path=None)
+    assert app.load_last_good(store, str(path)) is None
+    poller = app.FeedPoller(store, "http://127.0.0.1:9/feed", interval=60, last_good_path=str(path))
+    try:
+        poller.start()
+        assert poller.running
+    finally:
+        poller.stop(timeout=5)
+
+
+# --- user-013 : lecture incrémentale du flux ---
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 1 << 16])
+def test_iter_feed_events_matches_json_load_at_any_chunk_size(chunk_size):
+    document = {
+        "Success": True,
+        "Error": 'a "quoted" } ] \\ string',
+        "Value": [feed_event(1), feed_event(2, extra=[{"G": 17, "T": 9, "P": 2.5, "C": 1.9}]), {"I": 3, "O1": "Équipe ☃"}],
+        "Tail": {"nested": [1, {"x": None}]},
+    }
+    text = json.dumps(document, ensure_ascii=False, indent=1)
+    assert list(app.iter_feed_events(io.StringIO(text), chunk_size)) == document["Value"]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"Value": []}', []),
+    ('{}', []),
+    ('{"Value": {"I": 5}}', [{"I": 5}]),
+    ('  {"Other": [1, 2], "Value": [{"I": 1}]}  ', [{"I": 1}]),
+])
+def test_iter_feed_events_edge_cases(text, expected):
+    assert list(app.iter_feed_events(io.StringIO(text), 2)) == expected
+
+
+def test_iter_feed_events_rejects_truncated_document():
+    with pytest.raises(ValueError):
+        list(app.iter_feed_events(io.StringIO('{"Value": [{"I": 1}, {"I": 2'), 4))
+
+
+# --- user-014 : snapshot binaire ---
+
+def match_fields(match):
+    return {name: getattr(match, name) for name in app.Match.FIELDS}
+
+
+@pytest.fixture
+def feed_file(tmp_path):
+    path = tmp_path / "feed.json"
+    events = [feed_event(1, minute=30, score=(1, 0), extra=[{"G": 17, "T": 9, "P": 2.5, "C": 1.9}]),
+              feed_event(2), {"I": 3, "O1": "Équipe ☃", "O2": "B"}]
+    path.write_text(json.dumps({"Value": events}, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+@pytest.mark.parametrize("shared", [False, True])
+def test_binary_snapshot_round_trip(feed_file, tmp_path, shared):
+    bin_path = tmp_path / "snapshot.bin"
+    snapshot = app.SnapshotStore(binary_path=str(bin_path)).refresh_from_file(str(feed_file))
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["feed.json", "snapshot.bin"]
+    loaded = app.load_binary_snapshot(str(bin_path), shared=shared)
+    assert (loaded.version, loaded.source, loaded.mtime, loaded.size) == \
+        (snapshot.version, snapshot.source, snapshot.mtime, snapshot.size)
+    assert [match_fields(m) for m in loaded.matches] == [match_fields(m) for m in snapshot.matches]
+
+
+@pytest.mark.parametrize("keep", [0, 10, app.BINARY_HEADER.size, app.BINARY_HEADER.size + 5, -1, -20])
+def test_truncated_binary_snapshot_is_ignored(feed_file, tmp_path, keep):
+    bin_path = tmp_path / "snapshot.bin"
+    app.SnapshotStore(binary_path=str(bin_path)).refresh_from_file(str(feed_file))
+    bin_path.write_bytes(bin_path.read_bytes()[:keep])
+    assert app.load_binary_snapshot(str(bin_path)) is None
+    assert app.load_binary_snapshot(str(bin_path), shared=True) is None
+
+
+def test_refresh_falls_back_to_json_when_binary_is_corrupt(feed_file, tmp_path):
+    bin_path = tmp_path / "snapshot.bin"
+    expected = app.SnapshotStore(binary_path=str(bin_path)).refresh_from_file(str(feed_file))
+    bin_path.write_bytes(bin_path.read_bytes()[:-20])
+    snapshot = app.SnapshotStore(binary_path=str(bin_path)).refresh_from_file(str(feed_file))
+    assert [match_fields(m) for m in snapshot.matches] == [match_fields(m) for m in expected.matches]
+    assert app.load_binary_snapshot(str(bin_path)) is not None  # réécrit après le rechargement JSON
+
+
+def test_save_binary_survives_unencodable_match(tmp_path):
+    bin_path = tmp_path / "snapshot.bin"
+    store = app.SnapshotStore(binary_path=str(bin_path))
+    snapshot = store.publish([app.Match(id="not-an-int", team1="A", team2="B", score1=0, score2=0,
+                                        odds=(), stats=[], markets=())], "test")
+    store.save_binary(snapshot)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_stale_binary_snapshot_is_rejected_before_decoding_records(feed_file, tmp_path, monkeypatch):
+    bin_path = tmp_path / "snapshot.bin"
+    app.SnapshotStore(binary_path=str(bin_path)).refresh_from_file(str(feed_file))
+    feed_file.write_text(json.dumps({"Value": [feed_event(9)]}), encoding="utf-8")
+    decoded = []
+    real_decode = app._decode_matches
+    monkeypatch.setattr(app, "_decode_matches", lambda *args: decoded.append(1) or real_decode(*args))
+    snapshot = app.SnapshotStore(binary_path=str(bin_path)).refresh_from_file(str(feed_file))
+    assert list(snapshot.by_id) == [9]
+    assert decoded == []
+    stat = feed_file.stat()
+    assert app.load_binary_snapshot(str(bin_path), source="other", mtime=stat.st_mtime_ns) is None
+    assert app.load_binary_snapshot(str(bin_path), source=str(feed_file), mtime=stat.st_mtime_ns) is not None
+    assert decoded == [1]
+
+
+# --- user-015 : snapshot partagé entre workers ---
+
+def test_shared_reader_follows_the_ingest_versions(feed_file, tmp_path):
+    bin_path = tmp_path / "snapshot.bin"
+    ingest = app.SnapshotStore(binary_path=str(bin_path))
+    ingest.resume_version(41)
+    ingest.refresh_from_file(str(feed_file))
+    worker = app.SnapshotStore(binary_path=None)
+    hub = app.UpdateHub(shared=True)
+    worker.subscribe(hub.publish)
+    reader = app.SharedSnapshotReader(worker, str(bin_path), check_interval=0)
+    snapshot = reader.current()
+    assert snapshot.version == 42 and sorted(snapshot.by_id) == [1, 2, 3]
+    assert reader.current() is snapshot
+    # Le premier snapshot d'un worker ne sérialise pas une ligne par match pour /stream
+    assert hub.since(0)[0].updates == []
+
+
+# --- user-017 : fan-out asynchrone ---
+
+def test_build_fanout_urls_covers_the_grid():
+    urls = app.build_fanout_urls("http://x/feed?count=100&lng=fr", {"sports": [1, 2], "lng": ["fr", "en"]})
+    params = [dict(app.urllib.parse.parse_qsl(app.urllib.parse.urlsplit(url).query)) for url in urls]
+    assert len(urls) == 4
+    assert {(p["sports"], p["lng"]) for p in params} == {("1", "fr"), ("1", "en"), ("2", "fr"), ("2", "en")}
+    assert all(p["count"] == "100" for p in params)
+
+
+def test_merge_events_keeps_first_occurrence():
+    merged = app.merge_events([[{"I": 1, "v": "a"}, {"v": "no-id"}], [{"I": 1, "v": "b"}, {"I": 2}, {"v": "no-id"}]])
+    assert merged == [{"I": 1, "v": "a"}, {"v": "no-id"}, {"I": 2}, {"v": "no-id"}]
+
+
+def fanout_stub(stub):
+    """Chaque valeur de `sports` renvoie ses propres matchs, l'événement 100 étant commun à tous"""
+    def events_for(path):
+        sport = int(dict(app.urllib.parse.parse_qsl(app.urllib.parse.urlsplit(path).query))["sports"])
+        return [feed_event(100, home=1.5 + sport), feed_event(sport)]
+    stub.events_for = events_for
+    return app.build_fanout_urls(stub.url, {"sports": [1, 2, 3]})
+
+
+def test_fanout_fetcher_merges_and_records_timings(stub, session):
+    urls = fanout_stub(stub)
+    fetcher = app.FanoutFetcher(urls, session=session, concurrency=2)
+    merged = fetcher.fetch()
+    assert [event["I"] for event in merged] == [100, 1, 2, 3]
+    assert merged[0]["E"][0]["C"] == 2.5  # l'événement commun vient de la première URL
+    assert [(t.url, t.status, t.count) for t in fetcher.timings] == [(url, "200", 2) for url in urls]
+    assert all(t.elapsed_ms >= 0 for t in fetcher.timings)
+    # Tout en 304 : rien n'a changé
+    assert fetcher.fetch() is None
+    assert [t.status for t in fetcher.timings] == ["304"] * 3
+
+
+def test_fanout_fetcher_reuses_previous_results_on_partial_failure(stub, session):
+    urls = fanout_stub(stub)
+    fetcher = app.FanoutFetcher(urls, session=session)
+    fetcher.fetch()
+    stub.etag = '"v2"'
+    stub.should_fail = lambda path: "sports=2" in path
+    merged = fetcher.fetch()
+    assert [event["I"] for event in merged] == [100, 1, 2, 3]
+    assert [t.status.split(":")[0] for t in fetcher.timings] == ["200", "erreur", "200"]
+    stub.should_fail = lambda path: True
+    with pytest.raises(RuntimeError):
+        fetcher.fetch()
+
+
+def test_fanout_fetcher_runs_all_requests_concurrently(stub, session, monkeypatch):
+    # Petite machine : l'exécuteur par défaut d'asyncio n'aurait que min(32, 1 + 4) threads
+    monkeypatch.setattr(app.os, "cpu_count", lambda: 1)
+    lock, state = threading.Lock(), {"inflight": 0, "max": 0}
+
+    def events_for(path):
+        with lock:
+            state["inflight"] += 1
+            state["max"] = max(state["max"], state["inflight"])
+        time.sleep(0.3)
+        with lock:
+            state["inflight"] -= 1
+        return [feed_event(1)]
+    stub.events_for = events_for
+    urls = app.build_fanout_urls(stub.url, {"page": range(8)})
+    app.FanoutFetcher(urls, session=session, concurrency=8).fetch()
+    assert state["max"] == 8
+
+
+# --- user-019 : différences entre snapshots ---
+
+def publish_events(store, events):
+    return store.publish(app.normalize_feed(events), "test")
+
+
+def test_diff_snapshots_reports_each_kind_of_change():
+    store = app.SnapshotStore(binary_path=None)
+    old = publish_events(store, [feed_event(1), feed_event(2), feed_event(3)])
+    new = publish_events(store, [feed_event(1), feed_event(2, home=1.9, score=(1, 0), minute=12), feed_event(4)])
+    changes = {delta.id: delta for delta in app.diff_snapshots(old, new)}
+    assert new.changes is not None and {d.id for d in new.changes} == set(changes)
+    assert sorted(changes) == [2, 3, 4]
+    assert changes[4].kind == "added" and changes[3].kind == "removed"
+    delta = changes[2]
+    assert delta.kind == "changed" and delta.score == ((0, 0), (1, 0)) and delta.minute == (0, 12)
+    assert delta.odds == [((1, 1, None), 1.8, 1.9)]
+
+
+def test_diff_snapshots_restricted_to_ids():
+    store = app.SnapshotStore(binary_path=None)
+    old = publish_events(store, [feed_event(1), feed_event(2)])
+    new = publish_events(store, [feed_event(1, away=5.0), feed_event(2, away=5.0)])
+    assert [d.id for d in app.diff_snapshots(old, new, ids=[2])] == [2]
+
+
+def test_diff_of_binary_snapshots_leaves_markets_undecoded(tmp_path):
+    bin_path = str(tmp_path / "snapshot.bin")
+    events = [feed_event(i, extra=[{"G": 17, "T": 9, "P": 2.5, "C": 1.9}]) for i in range(1, 4)]
+    store = app.SnapshotStore(binary_path=None)
+    app.write_binary_snapshot(publish_events(store, events), bin_path)
+    first = app.load_binary_snapshot(bin_path, shared=True)
+    events[1] = feed_event(2, extra=[{"G": 17, "T": 9, "P": 2.5, "C": 2.05}])
+    app.write_binary_snapshot(publish_events(store, events), bin_path)
+    second = app.load_binary_snapshot(bin_path, shared=True)
+
+    reader = app.SnapshotStore(binary_path=None)
+    old = reader.publish(first.matches, "shared")
+    new = reader.publish(second.matches, "shared")
+    assert [(d.id, d.odds) for d in new.changes] == [(2, [((17, 9, 2.5), 1.9, 2.05)])]
+    assert not any(isinstance(m._markets, tuple) for m in old.matches + new.matches)
+
+
+def test_fragment_cache_only_evicts_removed_matches():
+    store = app.SnapshotStore(binary_path=None)
+    cache = app.FragmentCache()
+    cache.sync(publish_events(store, [feed_event(1), feed_event(2)]))
+    cache._entries = {1: ("key", "<tr>1</tr>"), 2: ("key", "<tr>2</tr>")}
+    cache.sync(publish_events(store, [feed_event(1, score=(1, 0))]))
+    assert list(cache._entries) == [1]
+
+
+# --- user-020 : flux SSE ---
+
+@pytest.fixture
+def live_feed(monkeypatch):
+    store = app.SnapshotStore(binary_path=None)
+    hub = app.UpdateHub(history=4, shared=False)
+    store.subscribe(hub.publish)
+    monkeypatch.setattr(app, "feed_store", store)
+    monkeypatch.setattr(app, "update_hub", hub)
+    monkeypatch.setattr(app, "get_snapshot", lambda: store.current)
+    return store, hub
+
+
+def open_stream(query="", headers=None):
+    with app.app.test_request_context("/stream" + query, headers=headers or {}):
+        return iter(app.stream().response)
+
+
+def sse_fields(chunk):
+    return dict(line.split(": ", 1) for line in chunk.decode().splitlines() if ": " in line and not line.startswith(":"))
+
+
+def test_update_hub_ids_carry_the_worker_epoch():
+    hub, other = app.UpdateHub(shared=False), app.UpdateHub(shared=False)
+    assert hub.parse_id(hub.event_id(12)) == 12
+    assert hub.parse_id(other.event_id(12)) is None
+    assert hub.parse_id("12") is None and hub.parse_id(None) is None
+    shared = app.UpdateHub(shared=True)
+    assert shared.parse_id(app.UpdateHub(shared=True).event_id(7)) == 7
+
+
+def test_stream_replays_missed_versions(live_feed):
+    store, hub = live_feed
+    first = publish_events(store, [feed_event(1), feed_event(2)])
+    stream = open_stream(f"?since={hub.event_id(first.version)}")
+    assert sse_fields(next(stream))["id"] == hub.event_id(first.version)
+    second = publish_events(store, [feed_event(1, score=(1, 0)), feed_event(2)])
+    update = sse_fields(next(stream))
+    assert update["event"] == "update" and update["id"] == hub.event_id(second.version)
+    assert [row["id"] for row in json.loads(update["data"])] == [1]
+
+
+@pytest.mark.parametrize("resume", ["other-worker", "lost-history"])
+def test_stream_sends_current_state_instead_of_reset(live_feed, resume):
+    store, hub = live_feed
+    first = publish_events(store, [feed_event(1), feed_event(2)])
+    for minute in range(1, 7):
+        publish_events(store, [feed_event(1, minute=minute), feed_event(2)])
+    since = "deadbeef-%d" % first.version if resume == "other-worker" else hub.event_id(first.version)
+    stream = open_stream(headers={"Last-Event-ID": since})
+    next(stream)
+    state = sse_fields(next(stream))
+    assert state["event"] == "state" and state["id"] == hub.event_id(store.current.version)
+    rows = json.loads(state["data"])
+    assert [(row["id"], row["kind"]) for row in rows] == [(1, "changed"), (2, "changed")]
+
+
+def test_stream_state_applies_filters(live_feed):
+    store, hub = live_feed
+    publish_events(store, [feed_event(1, minute=10), dict(feed_event(2), LE="NBA")])
+    stream = open_stream("?league=NBA&since=unknown")
+    next(stream)
+    assert [row["id"] for row in json.loads(sse_fields(next(stream))["data"])] == [2]
+
+
+# --- user-025 : arbitrages ---
+
+def surebet_event(event_id, home=2.2, draw=4.0, away=4.5, **kwargs):
+    """1X2 dont la somme des 1/cote est sous 1 tant que les cotes ne baissent pas"""
+    return feed_event(event_id, home=home, draw=draw, away=away, **kwargs)
+
+
+def full_scan(snapshot):
+    return app.ArbitrageDetector.evaluate(snapshot, list(snapshot.by_id))
+
+
+def test_incremental_arbitrage_matches_full_scan():
+    store = app.SnapshotStore(binary_path=None)
+    detector = app.ArbitrageDetector()
+    store.subscribe(detector.update)
+    feeds = [
+        [surebet_event(1, minute=20), feed_event(2), surebet_event(3)],
+        [surebet_event(1, score=(1, 0), minute=20), feed_event(2), surebet_event(3)],  # score seul
+        [surebet_event(1, score=(1, 0), minute=21), surebet_event(2), surebet_event(3, home=1.5)],
+        [surebet_event(1, finished=True), surebet_event(2), surebet_event(4)],
+    ]
+    for events in feeds:
+        snapshot = publish_events(store, events)
+        assert detector.version == snapshot.version
+        assert detector._found == full_scan(snapshot)
+    assert sorted(o["id"] for o in detector.opportunities()) == [2, 4]
+
+
+def test_score_only_delta_keeps_opportunity():
+    store = app.SnapshotStore(binary_path=None)
+    detector = app.ArbitrageDetector()
+    store.subscribe(detector.update)
+    publish_events(store, [surebet_event(1, minute=5)])
+    assert [o["kind"] for o in detector.opportunities(1)] == ["1x2"]
+    evaluated = detector.evaluated
+    snapshot = publish_events(store, [surebet_event(1, score=(0, 1), minute=6)])
+    assert [(d.score, d.odds) for d in snapshot.changes] == [(((0, 0), (0, 1)), [])]
+    assert [o["kind"] for o in detector.opportunities(1)] == ["1x2"]
+    assert detector.evaluated == evaluated
+
+
+# --- user-018 : planificateur par match ---
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def event_stub(stub, events):
+    """Le stub sert aussi /event?id=N à partir du dictionnaire `events`"""
+    def events_for(path):
+        if path.startswith("/event"):
+            return events[int(path.split("id=")[1])]
+        return list(events.values())
+    stub.events_for = events_for
+    return stub.url.replace("/feed", "/event?id={id}")
+
+
+def requested_ids(stub):
+    return [int(path.split("id=")[1]) for path, _ in stub.requests if path.startswith("/event")]
+
+
+def make_scheduler(store, stub, session, events, clock, **kwargs):
+    return app.MatchScheduler(store, event_stub(stub, events), session=session, clock=clock,
+                              upcoming_interval=0, workers=1, **kwargs)
+
+
+def test_scheduler_serves_live_matches_first_under_a_short_budget(stub, session):
+    events = {1: feed_event(1), 2: feed_event(2, minute=10), 3: feed_event(3), 4: feed_event(4, minute=20)}
+    store = app.SnapshotStore(binary_path=None)
+    publish_events(store, events.values())
+    clock = FakeClock()
+    scheduler = make_scheduler(store, stub, session, events, clock, budget=2)
+    assert sorted(scheduler.tick()) == [2, 4]
+    assert sorted(requested_ids(stub)) == [2, 4]
+    clock.now += 1
+    scheduler.tick()
+    assert sorted(requested_ids(stub)[2:]) == [1, 3]
+
+
+def test_scheduler_drops_finished_matches(stub, session):
+    events = {1: feed_event(1, minute=80), 2: feed_event(2, minute=90, finished=True)}
+    store = app.SnapshotStore(binary_path=None)
+    publish_events(store, events.values())
+    clock = FakeClock()
+    scheduler = make_scheduler(store, stub, session, events, clock, budget=5)
+    events[1] = feed_event(1, minute=90, finished=True)
+    scheduler.tick()
+    assert requested_ids(stub) == [1]
+    assert scheduler.stats()["scheduled"] == {"live": 0, "upcoming": 0}
+    clock.now += 60
+    assert scheduler.tick() == {}
+    assert requested_ids(stub) == [1]
+
+
+@pytest.mark.parametrize("budget, expected", [(0.5, 5), (2, 2 * 10)])
+def test_scheduler_respects_the_request_budget(stub, session, budget, expected):
+    events = {i: feed_event(i, minute=10) for i in range(1, 31)}
+    store = app.SnapshotStore(binary_path=None)
+    publish_events(store, events.values())
+    clock = FakeClock()
+    scheduler = make_scheduler(store, stub, session, events, clock, budget=budget, live_interval=0)
+    scheduler._tokens = 0
+    for _ in range(10):
+        clock.now += 1
+        scheduler.tick()
+    assert scheduler.requests == expected
+
+
+def test_bulk_poll_keeps_matches_refreshed_individually(stub, session):
+    events = {1: feed_event(1, minute=10), 2: feed_event(2, minute=10)}
+    store = app.SnapshotStore(binary_path=None)
+    clock = FakeClock()
+    scheduler = make_scheduler(store, stub, session, events, clock, budget=1)
+    poller = app.FeedPoller(store, stub.url, session=session, scheduler=scheduler, last_good_path=None)
+    poller.poll_once()
+    events[1] = feed_event(1, minute=11, score=(1, 0))
+    assert list(scheduler.tick()) == [1]
+    assert store.current.by_id[1].score1 == 1
+    # Le flux complet, en retard, renvoie encore l'ancienne version du match 1
+    events[1], events[2] = feed_event(1, minute=10), feed_event(2, minute=12)
+    stub.etag = '"v2"'
+    snapshot = poller.poll_once()
+    assert (snapshot.by_id[1].score1, snapshot.by_id[1].minute) == (1, 11)
+    assert [(d.id, d.minute) for d in snapshot.changes] == [(2, (10, 12))]
+
+
+# --- user-012 : API JSON ---
+
+@pytest.fixture
+def api_feed(monkeypatch):
+    store = app.SnapshotStore(binary_path=None)
+    monkeypatch.setattr(app, "get_snapshot", lambda: store.current)
+    return store
+
+
+def test_api_cursor_pages_through_the_feed(api_feed):
+    publish_events(api_feed, [feed_event(i) for i in range(1, 6)])
+    client = app.app.test_client()
+    seen, after = [], ""
+    while True:
+        data = client.get(f"/api/matches?limit=2&after={after}").get_json()
+        seen += [m["id"] for m in data["matches"]]
+        if data["next_cursor"] is None:
+            break
+        after = data["next_cursor"]
+    assert seen == [1, 2, 3, 4, 5]
+
+
+def test_api_cursor_survives_or_expires_across_snapshots(api_feed):
+    publish_events(api_feed, [feed_event(i) for i in range(1, 6)])
+    client = app.app.test_client()
+    first = client.get("/api/matches?limit=3").get_json()
+    assert first["next_cursor"] == 3
+    # Un autre match disparaît : le curseur reste valable et ne répète rien
+    publish_events(api_feed, [feed_event(i) for i in (1, 3, 4, 5)])
+    assert [m["id"] for m in client.get("/api/matches?limit=3&after=3").get_json()["matches"]] == [4, 5]
+    # Le match du curseur disparaît : 410 plutôt qu'un retour silencieux au début
+    publish_events(api_feed, [feed_event(i) for i in (1, 2, 4, 5)])
+    response = client.get("/api/matches?limit=3&after=3")
+    assert response.status_code == 410 and "error" in response.get_json()
+
+
+# --- user-016 : préchargement ---
+
+def test_fork_drops_pages_rendered_with_the_master_epoch(api_feed, monkeypatch):
+    hub = app.UpdateHub(shared=False)
+    cache = app.ResponseCache()
+    monkeypatch.setattr(app, "update_hub", hub)
+    monkeypatch.setattr(app, "response_cache", cache)
+    publish_events(api_feed, [feed_event(1)])
+    app.warm_home_page()
+    master_epoch = hub.epoch
+    assert f'data-version="{master_epoch}-1"'.encode() in next(iter(cache._entries.values())).body
+    app._after_fork_in_child()
+    assert hub.epoch != master_epoch and cache.stats()["size"] == 0
+    app.warm_home_page()
+    assert f'data-version="{hub.epoch}-1"'.encode() in next(iter(cache._entries.values())).body
+
+
+# --- user-023 : modèle de Poisson ---
+
+needs_numpy = pytest.mark.skipif(app.np is None, reason="NumPy absent : modèle désactivé")
+
+
+def fair(*odds):
+    implied = [1 / c for c in odds]
+    return [p / sum(implied) for p in implied]
+
+
+@needs_numpy
+@pytest.mark.parametrize("row, line", [
+    ((1.8, 3.6, 4.5), (2.5, 1.9, 1.95)),
+    ((3.2, 3.3, 2.3), (2.5, 2.2, 1.7)),
+    ((1.3, 5.5, 9.0), (3.5, 2.05, 1.8)),
+])
+def test_score_model_reproduces_total_and_supremacy(row, line):
+    model = app.ScoreModel()
+    home, away = model.fit([row], [line])
+    mu = float(home[0] + away[0])
+    # Le modèle tronque la loi à max_goals buts : même définition ici
+    over = sum(math.exp(-mu) * mu ** k / math.factorial(k) for k in range(int(line[0]) + 1, model.max_goals + 1))
+    assert over == pytest.approx(fair(line[1], line[2])[0], abs=1e-3)
+    result = model.describe(home, away)[0]
+    p1, _, p2 = fair(*row)
+    assert result["1x2"]["1"] - result["1x2"]["2"] == pytest.approx(p1 - p2, abs=2e-3)
+    assert result["over"][f"{int(line[0])}.5"] == pytest.approx(over, abs=2e-3)
+
+
+def football_event(event_id, home=1.8, over=1.9, under=1.95):
+    return feed_event(event_id, home=home, extra=[{"G": 17, "T": 9, "P": 2.5, "C": over},
+                                                  {"G": 17, "T": 10, "P": 2.5, "C": under}])
+
+
+@needs_numpy
+def test_score_model_refits_only_changed_events(monkeypatch):
+    store = app.SnapshotStore(binary_path=None)
+    model = app.ScoreModel()
+    fitted = []
+    real_fit = model.fit
+    monkeypatch.setattr(model, "fit", lambda rows, lines: fitted.append(len(rows)) or real_fit(rows, lines))
+    first = publish_events(store, [football_event(1), football_event(2)])
+    assert first.by_id[1].sport == "Football"
+    before = model.predict(first, 1)
+    assert fitted == [2]
+    second = publish_events(store, [football_event(1), football_event(2, over=1.7, under=2.2)])
+    assert model.predict(second, 1) == before
+    assert fitted == [2, 1]
+    assert model.predict(second, 2)["over"]["2.5"] > before["over"]["2.5"]
+
+
+# --- user-021 : historique des cotes ---
+
+def test_odds_series_ring_wraps_around_in_order():
+    series = app.OddsSeries(capacity=3)
+    for i in range(5):
+        series.append(100.0 + i, 1.5 + i)
+    assert series.points() == [[102.0, 3.5], [103.0, 4.5], [104.0, 5.5]]
+    assert len(series.values) == 3
+    for i in range(5, 7):
+        series.append(100.0 + i, 1.5 + i)
+    assert [t for t, _ in series.points()] == [104.0, 105.0, 106.0]
+
+
+def test_odds_history_records_changes_and_forgets_finished_matches():
+    store = app.SnapshotStore(binary_path=None)
+    history = app.OddsHistory(capacity=4, max_events=2)
+    store.subscribe(history.record)
+    publish_events(store, [feed_event(1, minute=5), feed_event(2, minute=5)])
+    publish_events(store, [feed_event(1, minute=6, home=1.7), feed_event(2, minute=6)])
+    assert [c for _, c in history.series(1)[(1, 1, None)]] == [1.8, 1.7]
+    assert [c for _, c in history.series(1)[(1, 3, None)]] == [3.4]  # inchangée : un seul point
+    assert list(history.series(2, group=1)) == [(1, 1, None), (1, 3, None), (1, 2, None)]
+    publish_events(store, [feed_event(1, minute=90, finished=True), feed_event(2, minute=7), feed_event(3)])
+    assert history.series(1) == {}
+    # max_events : le match dont les cotes n'ont pas bougé depuis le plus longtemps est oublié
+    publish_events(store, [feed_event(2, minute=8), feed_event(3), feed_event(4)])
+    assert history.stats()["events"] == 2 and history.series(2) == {}
+
+
+# --- user-022 : probabilités implicites et marge ---
+
+def test_feed_analytics_books_per_match():
+    store = app.SnapshotStore(binary_path=None)
+    snapshot = publish_events(store, [
+        football_event(1, home=2.0, over=1.9, under=1.9),
+        feed_event(2, extra=[{"G": 17, "T": 9, "P": 3.5, "C": 2.1}]),  # ligne Plus/Moins incomplète
+        {"I": 3, "O1": "A", "O2": "B", "E": [{"G": 1, "T": 1, "C": 1.5}, {"G": 1, "T": 2, "C": 2.5}]},
+    ])
+    analytics = app.FeedAnalytics(snapshot)
+    x12, total = analytics.markets(1)
+    assert x12["market"] == "1x2" and [o["label"] for o in x12["outcomes"]] == ["1", "X", "2"]
+    overround = 1 / 2.0 + 1 / 3.4 + 1 / 4.2
+    assert x12["overround"] == round(overround, 4) and x12["margin"] == round(overround - 1, 4)
+    assert [o["fair"] for o in x12["outcomes"]] == [round(1 / c / overround, 4) for c in (2.0, 3.4, 4.2)]
+    assert (total["market"], total["group"], total["line"]) == ("total", 17, 2.5)
+    assert [o["fair"] for o in total["outcomes"]] == [0.5, 0.5]
+    assert [b["market"] for b in analytics.markets(2)] == ["1x2"]
+    assert analytics.markets(3) == [] and analytics.one_x_two(3) is None
+    assert analytics.one_x_two(1) == app.one_x_two_book(snapshot.by_id[1])
+
+
+def test_implied_probabilities_without_numpy_match_numpy(monkeypatch):
+    rows = [(1.8, 3.4, 4.2), (2.5, 3.1, 2.9)]
+    vectorized = app.implied_probabilities(rows)
+    monkeypatch.setattr(app, "np", None)
+    implied, overround, fair = app.implied_probabilities(rows)
+    assert overround == pytest.approx(vectorized[1])
+    for row, expected in zip(implied + fair, vectorized[0] + vectorized[2]):
+        assert row == pytest.approx(expected)
+
+
+# --- user-024 : scanner de paris alternatifs ---
+
+def scanner_events():
+    rnd = random.Random(7)
+    return [feed_event(i, extra=[{"G": rnd.choice((2, 3, 17)), "T": rnd.randint(1, 10), "P": rnd.choice((None, 1.5, 2.5)),
+                                  "C": round(rnd.uniform(1.2, 4.0), 2)} for _ in range(6)])
+            for i in range(1, 41)]
+
+
+@pytest.mark.parametrize("min_odds, max_odds, groups, limit", [
+    (1.499, 3.0, None, 10), (1.0, 100.0, None, 500), (2.0, 2.5, frozenset({17}), 5), (1.5, 3.0, frozenset({2, 3}), 1),
+])
+def test_scan_markets_matches_a_full_sort(min_odds, max_odds, groups, limit):
+    store = app.SnapshotStore(binary_path=None)
+    snapshot = publish_events(store, scanner_events())
+    picks = app.scan_markets(snapshot, snapshot.all_bitmap, min_odds, max_odds, groups, limit)
+    expected = sorted((
+        (c, pos, g, t, p) for pos, m in enumerate(snapshot.matches) for g, t, p, c in m.markets
+        if g != 1 and min_odds <= c <= max_odds and (groups is None or g in groups)), key=lambda c: c[:2])[:limit]
+    assert [(p["cote"], p["id"], p["market"]) for p in picks] == \
+        [(c, snapshot.matches[pos].id, [g, t, p]) for c, pos, g, t, p in expected]
+
+
+def test_scanner_route_filters_and_validates(api_feed):
+    publish_events(api_feed, scanner_events() + [dict(feed_event(99, extra=[{"G": 17, "T": 9, "P": 2.5, "C": 1.2011}]),
+                                                        LE="NBA")])
+    client = app.app.test_client()
+    picks = client.get("/scanner?min_odds=1.201&max_odds=1.202").get_json()["picks"]
+    assert [p["id"] for p in picks] == [99]
+    nba = client.get("/scanner?league=NBA&min_odds=1&max_odds=10").get_json()["picks"]
+    assert {p["id"] for p in nba} == {99}
+    assert all(p["market"][0] == 3 for p in client.get("/scanner?group=3").get_json()["picks"])
+    assert client.get("/scanner?min_odds=abc").status_code == 400
+
+
+# --- user-009 : cache de pages, ETag et 304 ---
+
+@pytest.fixture
+def page_cache(api_feed, monkeypatch):
+    cache = app.ResponseCache()
+    monkeypatch.setattr(app, "response_cache", cache)
+    publish_events(api_feed, [feed_event(1), feed_event(2, minute=10)])
+    return cache
+
+
+def test_pages_are_rendered_once_and_revalidated_with_304(api_feed, page_cache):
+    client = app.app.test_client()
+    first = client.get("/?status=live")
+    assert first.status_code == 200 and first.headers["ETag"]
+    assert "no-cache" in first.headers["Cache-Control"]
+    again = client.get("/?status=live", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304 and again.data == b""
+    assert page_cache.stats()["misses"] == 1 and page_cache.stats()["not_modified"] == 1
+    # Autres filtres : autre entrée ; nouvelle version du flux : nouvel ETag
+    assert client.get("/").headers["ETag"] != first.headers["ETag"]
+    publish_events(api_feed, [feed_event(1), feed_event(2, minute=11)])
+    changed = client.get("/?status=live", headers={"If-None-Match": first.headers["ETag"]})
+    assert changed.status_code == 200 and changed.headers["ETag"] != first.headers["ETag"]
+
+
+# --- user-010 : variantes compressées ---
+
+@pytest.mark.parametrize("accept, expected", [
+    ("gzip", "gzip"), ("br, gzip", "br" if app.brotli is not None else "gzip"),
+    ("gzip;q=0, identity", None), ("", None),
+])
+def test_pages_are_served_in_the_negotiated_encoding(page_cache, accept, expected):
+    client = app.app.test_client()
+    plain = client.get("/api/matches", headers={"Accept-Encoding": ""})
+    response = client.get("/api/matches", headers={"Accept-Encoding": accept})
+    assert response.headers.get("Content-Encoding") == expected
+    assert "Accept-Encoding" in response.headers["Vary"]
+    if expected is None:
+        assert response.data == plain.data
+        return
+    decode = gzip.decompress if expected == "gzip" else app.brotli.decompress
+    assert decode(response.data) == plain.data
+    assert response.headers["ETag"] == plain.headers["ETag"][:-1] + f'-{expected}"'
+    revalidated = client.get("/api/matches", headers={"Accept-Encoding": accept, "If-None-Match": response.headers["ETag"]})
+    assert revalidated.status_code == 304
+    entry, = page_cache._entries.values()
+    assert list(entry.encoded) == [expected]  # compressée une seule fois, gardée avec la page